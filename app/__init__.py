@@ -1,23 +1,92 @@
 import os
-from flask import Flask
+import orjson
+import redis
+from flask import Flask, current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_socketio import SocketIO
+from werkzeug.local import LocalProxy
+from app.utils.helpers import eventlet_patched
+from app.utils.json_provider import OrjsonProvider, OrjsonSocketIOJSON
+from app.utils.query_counter import init_query_counter
 from config import config
 from __version__ import __version__
 
 # Initialize extensions
-db = SQLAlchemy()
+# Keep loaded attributes after commit so serializing a just-saved row needs no refresh
+db = SQLAlchemy(session_options={'expire_on_commit': False})
 migrate = Migrate()
 jwt = JWTManager()
 socketio = SocketIO()
 
+# Redis client bound to the current application (see create_app)
+redis_client = LocalProxy(lambda: current_app.extensions['redis'])
+
+# JWT error bodies never change, so serialize them once at import
+_JWT_ERROR_BODIES = {
+    'expired': orjson.dumps({'success': False, 'message': 'Token has expired'}),
+    'invalid': orjson.dumps({'success': False, 'message': 'Invalid token'}),
+    'missing': orjson.dumps({'success': False, 'message': 'Access token required'}),
+    'revoked': orjson.dumps({'success': False, 'message': 'Token has been revoked'}),
+}
+
+
+def _jwt_error_response(kind):
+    """Build a 401 response from a pre-serialized JWT error body"""
+    return current_app.response_class(
+        _JWT_ERROR_BODIES[kind], status=401, mimetype='application/json'
+    )
+
+
+# JWT callbacks are registered once on the module-level manager and reused
+# by every app created through the factory
+@jwt.token_in_blocklist_loader
+def check_if_token_revoked(jwt_header, jwt_payload):
+    from app.api.auth import is_token_revoked
+    return is_token_revoked(jwt_payload['jti'])
+
+
+@jwt.expired_token_loader
+def expired_token_callback(jwt_header, jwt_payload):
+    return _jwt_error_response('expired')
+
+
+@jwt.invalid_token_loader
+def invalid_token_callback(error):
+    return _jwt_error_response('invalid')
+
+
+@jwt.unauthorized_loader
+def missing_token_callback(error):
+    return _jwt_error_response('missing')
+
+
+@jwt.revoked_token_loader
+def revoked_token_callback(jwt_header, jwt_payload):
+    return _jwt_error_response('revoked')
+
+
+def _prewarm_db_pool(app, count):
+    """Open pooled connections ahead of the first requests"""
+    with app.app_context():
+        connections = []
+        try:
+            for _ in range(count):
+                connections.append(db.engine.connect())
+        except Exception as e:
+            app.logger.warning('Database pool prewarm stopped: %s', e)
+        finally:
+            # Closing hands each connection back to the pool still open
+            for connection in connections:
+                connection.close()
+
 
 def create_app(config_name=None):
     """Application factory function"""
     app = Flask(__name__)
+    app.json = OrjsonProvider(app)
     
     # Load configuration
     if config_name is None:
@@ -26,11 +95,22 @@ def create_app(config_name=None):
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
     
+    # psycopg2 blocks the whole eventlet hub during queries unless it yields
+    # through a wait callback, which would serialize every greenlet on the DB
+    if eventlet_patched():
+        from psycogreen.eventlet import patch_psycopg
+        patch_psycopg()
+    
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
     
+    # Redis connection pool shared by all requests in this worker
+    app.extensions['redis'] = redis.Redis(
+        connection_pool=redis.ConnectionPool.from_url(app.config['REDIS_URL'])
+    )
+    
     # Configure CORS
     CORS(app, origins=['http://localhost:3000', 'http://127.0.0.1:3000'])
     
@@ -38,9 +118,12 @@ def create_app(config_name=None):
     socketio.init_app(
         app,
         cors_allowed_origins=['http://localhost:3000', 'http://127.0.0.1:3000'],
-        async_mode='eventlet',
-        logger=True,
-        engineio_logger=True
+        async_mode=app.config['SOCKETIO_ASYNC_MODE'],
+        message_queue=app.config['SOCKETIO_REDIS_URL'],
+        transports=app.config['SOCKETIO_TRANSPORTS'],
+        json=OrjsonSocketIOJSON,
+        logger=app.debug,
+        engineio_logger=app.debug
     )
     
     # Register blueprints
@@ -50,41 +133,16 @@ def create_app(config_name=None):
     # Import WebSocket events to register them
     from app.websocket import events
     
-    # JWT configuration
-    from app.api.auth import blacklisted_tokens
-    
-    @jwt.token_in_blocklist_loader
-    def check_if_token_revoked(jwt_header, jwt_payload):
-        jti = jwt_payload['jti']
-        return jti in blacklisted_tokens
-    
-    @jwt.expired_token_loader
-    def expired_token_callback(jwt_header, jwt_payload):
-        return {
-            'success': False,
-            'message': 'Token has expired'
-        }, 401
-    
-    @jwt.invalid_token_loader
-    def invalid_token_callback(error):
-        return {
-            'success': False,
-            'message': 'Invalid token'
-        }, 401
+    # Subscribe to JWT blocklist invalidations for this worker
+    from app.api.auth import start_blocklist_listener
+    start_blocklist_listener(app)
     
-    @jwt.unauthorized_loader
-    def missing_token_callback(error):
-        return {
-            'success': False,
-            'message': 'Access token required'
-        }, 401
+    # Count queries per request in development and tests to surface N+1 patterns
+    init_query_counter(app, db)
     
-    @jwt.revoked_token_loader
-    def revoked_token_callback(jwt_header, jwt_payload):
-        return {
-            'success': False,
-            'message': 'Token has been revoked'
-        }, 401
+    # Connect in the background so early requests skip connection setup
+    if app.config['DB_POOL_PREWARM']:
+        socketio.start_background_task(_prewarm_db_pool, app, app.config['DB_POOL_PREWARM'])
     
     # Create upload directory
     upload_dir = app.config.get('UPLOAD_FOLDER', 'uploads')
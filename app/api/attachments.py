@@ -1,7 +1,14 @@
 import os
+import hashlib
+import mimetypes
+import tempfile
+from urllib.parse import quote
 from flask import request, jsonify, send_file, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from werkzeug.utils import secure_filename
+from werkzeug.exceptions import RequestedRangeNotSatisfiable, RequestEntityTooLarge
+from werkzeug.formparser import parse_form_data
+from werkzeug.http import is_resource_modified
+from werkzeug.wsgi import wrap_file
 
 from app import db
 from app.api import api
@@ -11,16 +18,181 @@ from app.utils.decorators import handle_api_errors, require_active_user, paginat
 from app.utils.validators import validate_file_size, validate_mime_type
 from app.utils.helpers import (
     create_api_response, generate_unique_filename, 
-    allowed_file, get_file_size_formatted
+    sanitize_and_check, get_file_size_formatted, paginate_keyset,
+    run_blocking, nonblocking_file
 )
 
 
+# MIME types returned by the 'document' file_type filter
+_DOC_MIME_TYPES = frozenset([
+    'application/pdf', 'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/vnd.ms-excel',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'text/plain', 'text/csv'
+])
+
+# Chunk and write-buffer size used when streaming uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+
+class _HashingFile:
+    """File wrapper that hashes and counts bytes as they are written"""
+    
+    def __init__(self, file_obj):
+        self._file = file_obj
+        self._hasher = hashlib.sha256()
+        self.size = 0
+    
+    def write(self, data):
+        self._hasher.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+    
+    def hexdigest(self):
+        return self._hasher.hexdigest()
+    
+    def __getattr__(self, name):
+        return getattr(self._file, name)
+
+
+def _create_upload_file(task_dir):
+    """Create a temporary file inside the task's upload directory
+    
+    Writes go through a native thread under eventlet so a large upload
+    doesn't block the other connections served by the worker. Size and
+    SHA-256 are computed in the same pass as the write.
+    """
+    return _HashingFile(nonblocking_file(tempfile.NamedTemporaryFile(
+        dir=task_dir, prefix='.upload-', delete=False, buffering=UPLOAD_CHUNK_SIZE
+    )))
+
+
+def _discard_file(path):
+    """Remove a partially received upload, ignoring errors"""
+    try:
+        run_blocking(os.remove, path)
+    except OSError:
+        pass
+
+
+def _receive_raw_upload(task_dir):
+    """Stream an application/octet-stream body directly into the task directory"""
+    filename = request.args.get('filename') or request.headers.get('X-Filename', '')
+    mime_type = (
+        request.headers.get('X-Content-Type')
+        or mimetypes.guess_type(filename)[0]
+        or 'application/octet-stream'
+    )
+    
+    # Touching the stream raises 413 for an oversized body before any file exists
+    stream = request.stream
+    chunk = stream.read(UPLOAD_CHUNK_SIZE)
+    
+    out = _create_upload_file(task_dir)
+    try:
+        while chunk:
+            out.write(chunk)
+            chunk = stream.read(UPLOAD_CHUNK_SIZE)
+    except BaseException:
+        # Aborted or oversized bodies must not leave partial files behind
+        out.close()
+        _discard_file(out.name)
+        raise
+    out.close()
+    
+    return filename, mime_type, out.name, out.size, out.hexdigest()
+
+
+def _receive_multipart_upload(task_dir):
+    """Parse a multipart body, spooling file parts straight into the task directory"""
+    spooled = []
+    
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        out = _create_upload_file(task_dir)
+        spooled.append(out)
+        return out
+    
+    try:
+        _, _, files = parse_form_data(
+            request.environ,
+            stream_factory=stream_factory,
+            max_form_memory_size=current_app.config.get('MAX_FORM_MEMORY_SIZE'),
+            max_content_length=current_app.config.get('MAX_CONTENT_LENGTH')
+        )
+    except BaseException:
+        # Parts spooled before the body was rejected or cut short
+        for out in spooled:
+            out.close()
+            _discard_file(out.name)
+        raise
+    
+    file = files.get('file')
+    for out in spooled:
+        if file is None or out.name != file.stream.name:
+            out.close()
+            _discard_file(out.name)
+    
+    if file is None:
+        return None
+    
+    out = file.stream
+    out.close()
+    
+    return file.filename, file.content_type or 'application/octet-stream', out.name, out.size, out.hexdigest()
+
+
+def _link_existing(source_path, file_path):
+    """Hard-link an already stored file to a new path, returning success"""
+    try:
+        run_blocking(os.link, source_path, file_path)
+        return True
+    except OSError:
+        return False
+
+
+def _range_not_satisfiable(size):
+    """Build a 416 response advertising the file's full length"""
+    response = create_api_response(False, 'Requested range not satisfiable', None, 416)
+    response.headers['Content-Range'] = f'bytes */{size}'
+    return response
+
+
+def _validate_upload(filename, file_size, mime_type):
+    """Validate a received upload
+    
+    Returns an ``(error, clean_filename)`` tuple; ``error`` is None when the
+    upload is acceptable.
+    """
+    if not filename:
+        return 'No file selected', None
+    
+    allowed, clean_filename = sanitize_and_check(filename)
+    if not allowed:
+        return 'File type not allowed. Allowed types: txt, pdf, png, jpg, jpeg, gif, doc, docx, xls, xlsx', None
+    
+    size_validation = validate_file_size(file_size)
+    if not size_validation['valid']:
+        return size_validation['message'], None
+    
+    mime_validation = validate_mime_type(mime_type)
+    if not mime_validation['valid']:
+        return mime_validation['message'], None
+    
+    return None, clean_filename
+
+
 @api.route('/tasks/<int:task_id>/attachments', methods=['POST'])
 @jwt_required()
 @require_active_user
 @handle_api_errors
 def upload_attachment(task_id):
-    """Upload file attachment to a task"""
+    """Upload file attachment to a task
+    
+    Accepts either a multipart form with a ``file`` field or a raw
+    ``application/octet-stream`` body with the filename passed in the
+    ``filename`` query parameter (or ``X-Filename`` header).
+    """
     current_user_id = get_jwt_identity()
     
     # Check if task exists and user can edit it
@@ -31,55 +203,46 @@ def upload_attachment(task_id):
     if not task.can_user_edit(current_user_id):
         return create_api_response(False, 'Permission denied', None, 403)
     
-    # Check if file is in request
-    if 'file' not in request.files:
-        return create_api_response(False, 'No file provided', None, 400)
+    # Create upload directory if it doesn't exist
+    upload_dir = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+    task_dir = os.path.join(upload_dir, 'tasks', str(task_id))
+    run_blocking(os.makedirs, task_dir, exist_ok=True)
     
-    file = request.files['file']
+    # Receive the body straight into the task directory; both paths remove any
+    # partial file before a rejected body propagates
+    try:
+        if request.mimetype == 'application/octet-stream':
+            received = _receive_raw_upload(task_dir)
+        else:
+            received = _receive_multipart_upload(task_dir)
+    except RequestEntityTooLarge:
+        return create_api_response(False, 'File too large', None, 413)
     
-    # Check if file is selected
-    if file.filename == '':
-        return create_api_response(False, 'No file selected', None, 400)
+    if received is None:
+        return create_api_response(False, 'No file provided', None, 400)
+    filename, mime_type, temp_path, file_size, content_hash = received
     
     # Validate file
-    if not allowed_file(file.filename):
-        return create_api_response(
-            False, 
-            'File type not allowed. Allowed types: txt, pdf, png, jpg, jpeg, gif, doc, docx, xls, xlsx',
-            None, 
-            400
-        )
-    
-    # Check file size
-    file.seek(0, os.SEEK_END)
-    file_size = file.tell()
-    file.seek(0)  # Reset file pointer
-    
-    size_validation = validate_file_size(file_size)
-    if not size_validation['valid']:
-        return create_api_response(False, size_validation['message'], None, 400)
-    
-    # Get MIME type
-    mime_type = file.content_type or 'application/octet-stream'
-    
-    # Validate MIME type
-    mime_validation = validate_mime_type(mime_type)
-    if not mime_validation['valid']:
-        return create_api_response(False, mime_validation['message'], None, 400)
+    error, original_filename = _validate_upload(filename, file_size, mime_type)
+    if error:
+        _discard_file(temp_path)
+        return create_api_response(False, error, None, 400)
     
     try:
         # Generate unique filename
-        original_filename = secure_filename(file.filename)
         unique_filename = generate_unique_filename(original_filename)
         
-        # Create upload directory if it doesn't exist
-        upload_dir = current_app.config.get('UPLOAD_FOLDER', 'uploads')
-        task_dir = os.path.join(upload_dir, 'tasks', str(task_id))
-        os.makedirs(task_dir, exist_ok=True)
-        
-        # Save file
+        # Hard-link identical content already on disk, otherwise move the upload into place
         file_path = os.path.join(task_dir, unique_filename)
-        file.save(file_path)
+        duplicate = Attachment.query.with_entities(Attachment.file_path).filter_by(
+            content_hash=content_hash,
+            file_size=file_size
+        ).first()
+        
+        if duplicate and _link_existing(duplicate.file_path, file_path):
+            _discard_file(temp_path)
+        else:
+            run_blocking(os.replace, temp_path, file_path)
         
         # Create attachment record
         attachment = Attachment(
@@ -89,7 +252,8 @@ def upload_attachment(task_id):
             file_size=file_size,
             mime_type=mime_type,
             task_id=task_id,
-            uploaded_by=current_user_id
+            uploaded_by=current_user_id,
+            content_hash=content_hash
         )
         
         db.session.add(attachment)
@@ -105,11 +269,9 @@ def upload_attachment(task_id):
     except Exception as e:
         db.session.rollback()
         # Try to remove file if it was created
-        try:
-            if 'file_path' in locals() and os.path.exists(file_path):
-                os.remove(file_path)
-        except:
-            pass
+        _discard_file(temp_path)
+        if 'file_path' in locals():
+            _discard_file(file_path)
         
         current_app.logger.error(f'File upload error: {str(e)}')
         return create_api_response(False, 'Failed to upload file', None, 500)
@@ -198,18 +360,61 @@ def download_attachment(attachment_id):
     if not attachment.can_user_access(current_user_id):
         return create_api_response(False, 'Access denied', None, 403)
     
-    # Check if file exists
-    if not os.path.exists(attachment.file_path):
+    # Let nginx serve the file from an internal location when configured
+    accel_prefix = current_app.config.get('X_ACCEL_REDIRECT_PREFIX')
+    if accel_prefix:
+        upload_dir = current_app.config.get('UPLOAD_FOLDER', 'uploads')
+        rel_path = os.path.relpath(attachment.file_path, upload_dir)
+        response = current_app.response_class(mimetype=attachment.mime_type)
+        response.headers['X-Accel-Redirect'] = f"{accel_prefix.rstrip('/')}/{quote(rel_path)}"
+        response.headers.set('Content-Disposition', 'attachment', filename=attachment.original_filename)
+        return response
+    
+    # X-Sendfile needs a path; the front-end server opens the file itself
+    if current_app.config.get('USE_X_SENDFILE'):
+        try:
+            return send_file(
+                attachment.file_path,
+                as_attachment=True,
+                download_name=attachment.original_filename,
+                mimetype=attachment.mime_type,
+                conditional=True
+            )
+        except FileNotFoundError:
+            return create_api_response(False, 'File not found on server', None, 404)
+        except RequestedRangeNotSatisfiable:
+            return _range_not_satisfiable(os.path.getsize(attachment.file_path))
+    
+    # Open once and stat the descriptor instead of exists() followed by a re-open
+    try:
+        file_obj = run_blocking(open, attachment.file_path, 'rb')
+    except FileNotFoundError:
         return create_api_response(False, 'File not found on server', None, 404)
     
     try:
-        return send_file(
-            attachment.file_path,
-            as_attachment=True,
-            download_name=attachment.original_filename,
-            mimetype=attachment.mime_type
+        stat = os.fstat(file_obj.fileno())
+        response = current_app.response_class(
+            wrap_file(request.environ, file_obj),
+            mimetype=attachment.mime_type,
+            direct_passthrough=True
+        )
+        response.headers.set('Content-Disposition', 'attachment', filename=attachment.original_filename)
+        response.content_length = stat.st_size
+        response.last_modified = stat.st_mtime
+        response.cache_control.no_cache = True
+        etag = attachment.content_hash or f'{stat.st_mtime}-{stat.st_size}'
+        response.set_etag(etag)
+        # A matching validator must give 304 even when Range is present, but
+        # make_conditional serves the range first; only honour Range if modified
+        modified = is_resource_modified(request.environ, etag=etag, last_modified=response.last_modified)
+        return response.make_conditional(
+            request.environ, accept_ranges=modified, complete_length=stat.st_size
         )
+    except RequestedRangeNotSatisfiable:
+        file_obj.close()
+        return _range_not_satisfiable(stat.st_size)
     except Exception as e:
+        file_obj.close()
         current_app.logger.error(f'File download error: {str(e)}')
         return create_api_response(False, 'Failed to download file', None, 500)
 
@@ -256,7 +461,11 @@ def delete_attachment(attachment_id):
 @paginate_query
 @handle_api_errors
 def get_my_attachments(page=1, per_page=20):
-    """Get attachments uploaded by current user"""
+    """Get attachments uploaded by current user
+    
+    Pass ``cursor`` (empty for the first page, then the returned
+    ``next_cursor``) to use keyset pagination instead of page numbers.
+    """
     current_user_id = get_jwt_identity()
     
     query = Attachment.query.filter_by(
@@ -267,16 +476,28 @@ def get_my_attachments(page=1, per_page=20):
     file_type = request.args.get('file_type')
     if file_type:
         if file_type == 'image':
-            query = query.filter(Attachment.mime_type.startswith('image/'))
+            # Literal prefix pattern so the text_pattern_ops index applies
+            query = query.filter(Attachment.mime_type.like('image/%'))
         elif file_type == 'document':
-            doc_types = [
-                'application/pdf', 'application/msword',
-                'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                'application/vnd.ms-excel',
-                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-                'text/plain', 'text/csv'
-            ]
-            query = query.filter(Attachment.mime_type.in_(doc_types))
+            query = query.filter(Attachment.mime_type.in_(_DOC_MIME_TYPES))
+    
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        items, next_cursor = paginate_keyset(
+            query, Attachment.created_at, Attachment.id, cursor, per_page
+        )
+        return create_api_response(
+            True,
+            'My attachments retrieved successfully',
+            {
+                'attachments': [attachment.to_dict() for attachment in items],
+                'pagination': {
+                    'per_page': per_page,
+                    'has_next': next_cursor is not None,
+                    'next_cursor': next_cursor
+                }
+            }
+        )
     
     attachments = query.paginate(
         page=page,
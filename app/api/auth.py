@@ -1,72 +1,140 @@
+import threading
+import time
 from datetime import datetime, timedelta
-from flask import request, jsonify, current_app
+import msgspec
+import redis
+from cachetools import TTLCache
+from flask import jsonify, current_app, g
 from flask_jwt_extended import (
     create_access_token, create_refresh_token, jwt_required, 
     get_jwt_identity, get_jwt
 )
-from werkzeug.security import check_password_hash
 from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
 
-from app import db
+from app import db, redis_client
 from app.api import api
 from app.models.user import User
 from app.utils.validators import validate_email, validate_password
-from app.utils.decorators import handle_api_errors
+from app.utils.security import DUMMY_PASSWORD_HASH, verify_password
+from app.utils.decorators import handle_api_errors, require_active_user
+from app.utils.schemas import (
+    RegisterBody, LoginBody, ProfileUpdateBody, ChangePasswordBody, decode_body
+)
+
+# Redis key prefix for revoked token JTIs
+BLOCKLIST_PREFIX = 'bl:'
+BLOCKLIST_INVALIDATE_CHANNEL = 'bl:invalidate'
+
+# Process-local cache of JTIs known *not* to be revoked. Nearly every token
+# checked is live, so this skips the Redis round-trip on the hot path.
+# TTLCache is not thread-safe and the blocklist listener thread mutates it
+# too, so every access goes through _bl_negative_lock.
+_bl_negative = TTLCache(maxsize=10000, ttl=30)
+_bl_negative_lock = threading.Lock()
+
+
+class TokenBlocklistUnavailable(Exception):
+    """Raised when the Redis token blocklist cannot be read or written"""
+
+
+def is_token_revoked(jti):
+    """Check if a token JTI has been revoked
+    
+    Fails closed: if Redis cannot be reached the token's state is unknown,
+    so the request is refused with a 503 rather than trusting the token.
+    """
+    with _bl_negative_lock:
+        if jti in _bl_negative:
+            return False
+    
+    try:
+        revoked = bool(redis_client.exists(f'{BLOCKLIST_PREFIX}{jti}'))
+    except redis.RedisError as e:
+        current_app.logger.error('Token blocklist lookup failed: %s', e)
+        raise TokenBlocklistUnavailable() from e
+    if not revoked:
+        with _bl_negative_lock:
+            _bl_negative[jti] = True
+    return revoked
 
-# In-memory blacklist for revoked tokens (in production, use Redis)
-blacklisted_tokens = set()
+
+def revoke_token(jwt_payload):
+    """Add a token JTI to the blocklist until the token expires"""
+    jti = jwt_payload['jti']
+    ttl = int(jwt_payload['exp'] - time.time())
+    if ttl > 0:
+        try:
+            redis_client.setex(f'{BLOCKLIST_PREFIX}{jti}', ttl, 1)
+        except redis.RedisError as e:
+            current_app.logger.error('Token revocation failed: %s', e)
+            raise TokenBlocklistUnavailable() from e
+    
+    # Drop the JTI from the negative cache here and in every other worker;
+    # if the broadcast is lost, other workers' entries still expire within the TTL
+    with _bl_negative_lock:
+        _bl_negative.pop(jti, None)
+    try:
+        redis_client.publish(BLOCKLIST_INVALIDATE_CHANNEL, jti)
+    except redis.RedisError as e:
+        current_app.logger.warning('Token revocation broadcast failed: %s', e)
+
+
+@api.errorhandler(TokenBlocklistUnavailable)
+def blocklist_unavailable(error):
+    """Refuse authenticated requests while revocation state is unknown"""
+    return jsonify({
+        'success': False,
+        'message': 'Authentication service temporarily unavailable'
+    }), 503
+
+
+def start_blocklist_listener(app):
+    """Subscribe this worker to blocklist invalidations from other workers"""
+    def handle_invalidation(message):
+        jti = message['data']
+        with _bl_negative_lock:
+            _bl_negative.pop(jti.decode() if isinstance(jti, bytes) else jti, None)
+    
+    try:
+        pubsub = app.extensions['redis'].pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(**{BLOCKLIST_INVALIDATE_CHANNEL: handle_invalidation})
+        return pubsub.run_in_thread(sleep_time=1, daemon=True)
+    except redis.RedisError as e:
+        app.logger.warning(f'Token blocklist listener not started: {str(e)}')
+        return None
 
 
 @api.route('/auth/register', methods=['POST'])
 @handle_api_errors
 def register():
     """Register a new user"""
-    data = request.get_json()
-    
-    # Validate required fields
-    required_fields = ['username', 'email', 'first_name', 'last_name', 'password']
-    for field in required_fields:
-        if not data.get(field):
-            return jsonify({
-                'success': False,
-                'message': f'{field.replace("_", " ").title()} is required'
-            }), 400
+    # Required fields are enforced by the schema
+    body = decode_body(RegisterBody)
     
     # Validate email format
-    if not validate_email(data['email']):
+    if not validate_email(body.email):
         return jsonify({
             'success': False,
             'message': 'Invalid email format'
         }), 400
     
     # Validate password strength
-    password_validation = validate_password(data['password'])
+    password_validation = validate_password(body.password)
     if not password_validation['valid']:
         return jsonify({
             'success': False,
             'message': password_validation['message']
         }), 400
     
-    # Check if user already exists
-    existing_user = User.query.filter(
-        or_(User.username == data['username'], User.email == data['email'])
-    ).first()
-    
-    if existing_user:
-        field = 'username' if existing_user.username == data['username'] else 'email'
-        return jsonify({
-            'success': False,
-            'message': f'User with this {field} already exists'
-        }), 409
-    
-    # Create new user
+    # Create new user; the unique indexes on username/email reject duplicates
     try:
         user = User(
-            username=data['username'],
-            email=data['email'],
-            first_name=data['first_name'],
-            last_name=data['last_name'],
-            password=data['password']
+            username=body.username,
+            email=body.email,
+            first_name=body.first_name,
+            last_name=body.last_name,
+            password=body.password
         )
         
         db.session.add(user)
@@ -89,6 +157,15 @@ def register():
             }
         }), 201
         
+    except IntegrityError as e:
+        db.session.rollback()
+        constraint = getattr(getattr(e.orig, 'diag', None), 'constraint_name', None) or str(e.orig)
+        field = 'email' if 'email' in constraint else 'username'
+        return jsonify({
+            'success': False,
+            'message': f'User with this {field} already exists'
+        }), 409
+        
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f'Registration error: {str(e)}')
@@ -102,21 +179,18 @@ def register():
 @handle_api_errors
 def login():
     """Authenticate user and return JWT tokens"""
-    data = request.get_json()
-    
-    # Validate required fields
-    if not data.get('identifier') or not data.get('password'):
-        return jsonify({
-            'success': False,
-            'message': 'Username/email and password are required'
-        }), 400
+    body = decode_body(LoginBody)
     
     # Find user by username or email
     user = User.query.filter(
-        or_(User.username == data['identifier'], User.email == data['identifier'])
+        or_(User.username == body.identifier, User.email == body.identifier)
     ).first()
     
-    if not user or not user.check_password(data['password']):
+    # Always verify a hash so unknown identifiers take as long as wrong passwords
+    password_ok = verify_password(
+        user.password_hash if user else DUMMY_PASSWORD_HASH, body.password
+    )
+    if not user or not password_ok:
         return jsonify({
             'success': False,
             'message': 'Invalid credentials'
@@ -128,6 +202,11 @@ def login():
             'message': 'Account is deactivated. Please contact support.'
         }), 403
     
+    # Upgrade legacy password hashes while we have the plain text
+    if user.password_needs_rehash():
+        user.set_password(body.password)
+        db.session.commit()
+    
     # Generate tokens
     access_token = create_access_token(
         identity=user.id,
@@ -154,7 +233,7 @@ def refresh():
     current_user_id = get_jwt_identity()
     
     # Check if user still exists and is active
-    user = User.query.get(current_user_id)
+    user = db.session.get(User, current_user_id)
     if not user or not user.is_active:
         return jsonify({
             'success': False,
@@ -181,8 +260,10 @@ def refresh():
 @handle_api_errors
 def logout():
     """Logout user and blacklist token"""
-    jti = get_jwt()['jti']
-    blacklisted_tokens.add(jti)
+    try:
+        revoke_token(get_jwt())
+    except TokenBlocklistUnavailable as e:
+        return blocklist_unavailable(e)
     
     return jsonify({
         'success': True,
@@ -192,17 +273,11 @@ def logout():
 
 @api.route('/auth/profile', methods=['GET'])
 @jwt_required()
+@require_active_user
 @handle_api_errors
 def get_profile():
     """Get current user's profile"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user:
-        return jsonify({
-            'success': False,
-            'message': 'User not found'
-        }), 404
+    user = g.current_user
     
     return jsonify({
         'success': True,
@@ -213,62 +288,56 @@ def get_profile():
 
 @api.route('/auth/profile', methods=['PUT'])
 @jwt_required()
+@require_active_user
 @handle_api_errors
 def update_profile():
     """Update current user's profile"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
-    
-    if not user:
-        return jsonify({
-            'success': False,
-            'message': 'User not found'
-        }), 404
-    
-    data = request.get_json()
+    user = g.current_user
     
-    # Update allowed fields
-    updatable_fields = ['first_name', 'last_name', 'email']
-    updated = False
+    body = decode_body(ProfileUpdateBody)
     
-    for field in updatable_fields:
-        if field in data and data[field] != getattr(user, field):
-            # Special validation for email
-            if field == 'email':
-                if not validate_email(data[field]):
-                    return jsonify({
-                        'success': False,
-                        'message': 'Invalid email format'
-                    }), 400
-                
-                # Check if email already exists
-                existing_user = User.query.filter(
-                    User.email == data[field],
-                    User.id != user.id
-                ).first()
-                
-                if existing_user:
-                    return jsonify({
-                        'success': False,
-                        'message': 'Email already in use'
-                    }), 409
-            
-            setattr(user, field, data[field])
-            updated = True
+    # Collect only the fields that were sent and actually change
+    patch = {}
+    for field in ('first_name', 'last_name', 'email'):
+        value = getattr(body, field)
+        if value is not msgspec.UNSET and value != getattr(user, field):
+            patch[field] = value
     
-    # Update full_name if first_name or last_name changed
-    if 'first_name' in data or 'last_name' in data:
-        user.full_name = f"{user.first_name} {user.last_name}"
-        updated = True
-    
-    if not updated:
+    if not patch:
         return jsonify({
             'success': True,
             'message': 'No changes made',
             'data': {'user': user.to_dict()}
         }), 200
     
+    # Special validation for email
+    if 'email' in patch:
+        if not validate_email(patch['email']):
+            return jsonify({
+                'success': False,
+                'message': 'Invalid email format'
+            }), 400
+        
+        # Check if email already exists
+        email_taken = db.session.query(
+            User.query.filter(User.email == patch['email'], User.id != user.id).exists()
+        ).scalar()
+        
+        if email_taken:
+            return jsonify({
+                'success': False,
+                'message': 'Email already in use'
+            }), 409
+    
+    # Update full_name if first_name or last_name changed
+    if 'first_name' in patch or 'last_name' in patch:
+        patch['full_name'] = f"{patch.get('first_name', user.first_name)} {patch.get('last_name', user.last_name)}"
+    
+    patch['updated_at'] = datetime.utcnow()
+    
     try:
+        # Single UPDATE; the loaded user is synchronized in place
+        User.query.filter_by(id=user.id).update(patch)
         db.session.commit()
         return jsonify({
             'success': True,
@@ -287,36 +356,23 @@ def update_profile():
 
 @api.route('/auth/change-password', methods=['PUT'])
 @jwt_required()
+@require_active_user
 @handle_api_errors
 def change_password():
     """Change user's password"""
-    current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    user = g.current_user
     
-    if not user:
-        return jsonify({
-            'success': False,
-            'message': 'User not found'
-        }), 404
-    
-    data = request.get_json()
-    
-    # Validate required fields
-    if not data.get('current_password') or not data.get('new_password'):
-        return jsonify({
-            'success': False,
-            'message': 'Current password and new password are required'
-        }), 400
+    body = decode_body(ChangePasswordBody)
     
     # Verify current password
-    if not user.check_password(data['current_password']):
+    if not user.check_password(body.current_password):
         return jsonify({
             'success': False,
             'message': 'Current password is incorrect'
         }), 400
     
     # Validate new password
-    password_validation = validate_password(data['new_password'])
+    password_validation = validate_password(body.new_password)
     if not password_validation['valid']:
         return jsonify({
             'success': False,
@@ -324,14 +380,14 @@ def change_password():
         }), 400
     
     # Check if new password is different from current
-    if user.check_password(data['new_password']):
+    if user.check_password(body.new_password):
         return jsonify({
             'success': False,
             'message': 'New password must be different from current password'
         }), 400
     
     try:
-        user.set_password(data['new_password'])
+        user.set_password(body.new_password)
         db.session.commit()
         
         return jsonify({
@@ -346,21 +402,3 @@ def change_password():
             'success': False,
             'message': 'Failed to change password'
         }), 500
-
-
-# JWT token blacklist checker
-@current_app.before_request
-def check_if_token_revoked():
-    """Check if JWT token is blacklisted"""
-    if request.endpoint and 'auth' in request.endpoint:
-        try:
-            jwt_payload = get_jwt()
-            jti = jwt_payload['jti']
-            if jti in blacklisted_tokens:
-                return jsonify({
-                    'success': False,
-                    'message': 'Token has been revoked'
-                }), 401
-        except:
-            # No JWT token present or invalid, let other decorators handle it
-            pass
\ No newline at end of file
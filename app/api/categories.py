@@ -1,15 +1,19 @@
-from datetime import datetime
-from flask import request, jsonify
+from collections import defaultdict
+from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, or_, desc
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, load_only
 
 from app import db
 from app.api import api
 from app.models.category import Category, TaskCategory
+from app.models.project import Project
 from app.models.task import Task
 from app.utils.decorators import handle_api_errors, require_active_user, paginate_query, validate_json_fields
 from app.utils.validators import validate_color_hex
-from app.utils.helpers import create_api_response, build_search_filters
+from app.utils.helpers import create_api_response, build_search_filters, paginate_keyset
+from app.utils.cache import cached_response, invalidate_cache
 
 
 @api.route('/categories', methods=['POST'])
@@ -31,18 +35,7 @@ def create_category():
     if not color_validation['valid']:
         return create_api_response(False, color_validation['message'], None, 400)
     
-    # Check if category with same name exists for user
-    existing_category = Category.query.filter(
-        and_(
-            Category.name.ilike(data['name'].strip()),
-            Category.user_id == current_user_id
-        )
-    ).first()
-    
-    if existing_category:
-        return create_api_response(False, 'Category with this name already exists', None, 409)
-    
-    # Create category
+    # Create category; the (user_id, lower(name)) unique index rejects duplicates
     category = Category(
         name=data['name'].strip(),
         color=color,
@@ -52,6 +45,7 @@ def create_category():
     try:
         db.session.add(category)
         db.session.commit()
+        invalidate_cache('category_stats', current_user_id)
         
         return create_api_response(
             True,
@@ -60,6 +54,9 @@ def create_category():
             201
         )
         
+    except IntegrityError:
+        db.session.rollback()
+        return create_api_response(False, 'Category with this name already exists', None, 409)
     except Exception as e:
         db.session.rollback()
         return create_api_response(False, 'Failed to create category', None, 500)
@@ -71,11 +68,18 @@ def create_category():
 @paginate_query
 @handle_api_errors
 def get_categories(page=1, per_page=50):
-    """Get user's categories"""
+    """Get user's categories
+    
+    Pass ``cursor`` (empty for the first page, then the returned
+    ``next_cursor``) to use keyset pagination, which stays fast on deep
+    pages; ``page`` numbers are kept for existing clients.
+    """
     current_user_id = get_jwt_identity()
     
-    # Base query for user's categories
-    query = Category.query.filter(Category.user_id == current_user_id)
+    # Base query for user's categories; list rows only need the compact columns
+    query = Category.query.options(
+        load_only(Category.id, Category.name, Category.color)
+    ).filter(Category.user_id == current_user_id)
     
     # Apply search filter if provided
     search = request.args.get('search')
@@ -87,28 +91,41 @@ def get_categories(page=1, per_page=50):
     # Sort by name
     query = query.order_by(Category.name.asc())
     
-    # Pagination
-    categories = query.paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
-    
     include_task_count = request.args.get('include_task_count', 'false').lower() == 'true'
     
+    # Pagination
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        items, next_cursor = paginate_keyset(
+            query, Category.name, Category.id, cursor, per_page, descending=False
+        )
+        pagination = {
+            'per_page': per_page,
+            'has_next': next_cursor is not None,
+            'next_cursor': next_cursor
+        }
+    else:
+        categories = query.paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
+        items = categories.items
+        pagination = {
+            'page': categories.page,
+            'per_page': categories.per_page,
+            'total': categories.total,
+            'pages': categories.pages,
+            'has_next': categories.has_next,
+            'has_prev': categories.has_prev
+        }
+    
     return create_api_response(
         True,
         'Categories retrieved successfully',
         {
-            'categories': [category.to_dict(include_task_count=include_task_count) for category in categories.items],
-            'pagination': {
-                'page': categories.page,
-                'per_page': categories.per_page,
-                'total': categories.total,
-                'pages': categories.pages,
-                'has_next': categories.has_next,
-                'has_prev': categories.has_prev
-            }
+            'categories': [category.to_list_dict(include_task_count=include_task_count) for category in items],
+            'pagination': pagination
         }
     )
 
@@ -121,7 +138,12 @@ def get_category(category_id):
     """Get a specific category"""
     current_user_id = get_jwt_identity()
     
-    category = Category.query.filter(
+    # Load the category's tasks in the same round trip
+    tasks_loader = selectinload(Category.tasks)
+    if current_app.debug:
+        # Any other relationship the tasks touch should be an explicit query
+        tasks_loader = tasks_loader.raiseload('*')
+    category = Category.query.options(tasks_loader).filter(
         and_(Category.id == category_id, Category.user_id == current_user_id)
     ).first()
     
@@ -131,7 +153,8 @@ def get_category(category_id):
     # Get tasks in this category
     tasks = category.get_tasks()
     
-    category_data = category.to_dict(include_task_count=True)
+    category_data = category.to_dict()
+    category_data['task_count'] = len(tasks)
     category_data['tasks'] = [{
         'id': task.id,
         'title': task.title,
@@ -172,19 +195,8 @@ def update_category(category_id):
     updated = False
     
     # Update name
+    # Duplicate names are rejected by the unique index on commit
     if 'name' in data and data['name'].strip() != category.name:
-        # Check if another category with same name exists
-        existing_category = Category.query.filter(
-            and_(
-                Category.name.ilike(data['name'].strip()),
-                Category.user_id == current_user_id,
-                Category.id != category_id
-            )
-        ).first()
-        
-        if existing_category:
-            return create_api_response(False, 'Category with this name already exists', None, 409)
-        
         category.name = data['name'].strip()
         updated = True
     
@@ -197,12 +209,14 @@ def update_category(category_id):
         category.color = data['color']
         updated = True
     
+    # A PUT that changes nothing returns before touching the database
     if not updated:
         return create_api_response(True, 'No changes made', {'category': category.to_dict()})
     
     try:
-        category.updated_at = datetime.utcnow()
+        # updated_at is stamped by the column's onupdate during the flush
         db.session.commit()
+        invalidate_cache('category_stats', current_user_id)
         
         return create_api_response(
             True,
@@ -210,6 +224,9 @@ def update_category(category_id):
             {'category': category.to_dict()}
         )
         
+    except IntegrityError:
+        db.session.rollback()
+        return create_api_response(False, 'Category with this name already exists', None, 409)
     except Exception as e:
         db.session.rollback()
         return create_api_response(False, 'Failed to update category', None, 500)
@@ -245,6 +262,7 @@ def delete_category(category_id):
     try:
         db.session.delete(category)
         db.session.commit()
+        invalidate_cache('category_stats', current_user_id)
         
         return create_api_response(True, 'Category deleted successfully')
         
@@ -292,13 +310,7 @@ def get_category_tasks(category_id, page=1, per_page=20):
         query = query.filter(Task.priority == priority)
     
     # Sort by priority and creation date
-    priority_order = db.case(
-        (Task.priority == 'critical', 4),
-        (Task.priority == 'high', 3),
-        (Task.priority == 'medium', 2),
-        (Task.priority == 'low', 1)
-    )
-    query = query.order_by(desc(priority_order), desc(Task.created_at))
+    query = query.order_by(desc(Task.priority_rank), desc(Task.created_at))
     
     # Pagination
     tasks = query.paginate(
@@ -328,31 +340,41 @@ def get_category_tasks(category_id, page=1, per_page=20):
 @api.route('/categories/stats', methods=['GET'])
 @jwt_required()
 @require_active_user
+@cached_response('category_stats', timeout=60)
 @handle_api_errors
 def get_category_stats():
     """Get category statistics"""
     current_user_id = get_jwt_identity()
     
-    # Get all user categories with task counts
+    # Get all user categories
     categories = Category.query.filter(Category.user_id == current_user_id).all()
     
+    # Task counts per (category, status) for every category in one query
+    status_counts = db.session.query(
+        Category.id,
+        Task.status,
+        db.func.count(Task.id)
+    ).outerjoin(
+        TaskCategory, TaskCategory.category_id == Category.id
+    ).outerjoin(
+        Task, Task.id == TaskCategory.task_id
+    ).filter(
+        Category.user_id == current_user_id
+    ).group_by(Category.id, Task.status).all()
+    
+    breakdowns = defaultdict(dict)
+    for category_id, status, count in status_counts:
+        if status is not None:
+            breakdowns[category_id][status] = count
+    
     stats = []
     total_tasks = 0
     
     for category in categories:
-        task_count = category.get_tasks_count()
+        status_breakdown = breakdowns[category.id]
+        task_count = sum(status_breakdown.values())
         total_tasks += task_count
         
-        # Get task status breakdown for this category
-        status_counts = db.session.query(
-            Task.status,
-            db.func.count(Task.id)
-        ).join(TaskCategory).filter(
-            TaskCategory.category_id == category.id
-        ).group_by(Task.status).all()
-        
-        status_breakdown = {status: count for status, count in status_counts}
-        
         stats.append({
             'category': category.to_dict(),
             'task_count': task_count,
@@ -1,16 +1,48 @@
-from datetime import datetime
-from flask import request, jsonify
+from collections import defaultdict
+from flask import request, jsonify, current_app
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import or_, and_, desc
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload, selectinload, load_only, raiseload
 
 from app import db
 from app.api import api
 from app.models.project import Project
 from app.models.project_member import ProjectMember
-from app.models.user import User
 from app.models.task import Task
 from app.utils.decorators import handle_api_errors, require_active_user, paginate_query, validate_json_fields
-from app.utils.helpers import create_api_response, build_search_filters
+from app.utils.helpers import create_api_response, build_search_filters, paginate_keyset
+from app.utils.cache import cached_response, invalidate_cache, invalidate_project_access
+
+# Cached responses that depend on which projects a user owns or belongs to:
+# project lists, dashboards, user stats and exclude_project_id user searches
+MEMBERSHIP_CACHES = ('projects', 'dashboard', 'user_stats', 'user_search')
+
+
+def _get_project_with_people(project_id):
+    """Load a project together with its owner and member users"""
+    options = [joinedload(Project.owner), selectinload(Project.member_users)]
+    if current_app.debug:
+        # Anything else the detail views touch should be an explicit query, not a lazy load
+        options.append(raiseload('*'))
+    return Project.query.options(*options).filter(Project.id == project_id).first()
+
+
+def _has_project_access(project, user_id):
+    """Check access against a project whose members are already loaded"""
+    return project.owner_id == user_id or any(
+        member.id == user_id for member in project.member_users
+    )
+
+
+def _user_summary(user):
+    """Public fields shown for project owners and members"""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'full_name': user.full_name,
+        'email': user.email
+    }
 
 
 @api.route('/projects', methods=['POST'])
@@ -26,18 +58,7 @@ def create_project():
     current_user_id = get_jwt_identity()
     data = request.get_json()
     
-    # Check if project with same name exists for user
-    existing_project = Project.query.filter(
-        and_(
-            Project.name.ilike(data['name'].strip()),
-            Project.owner_id == current_user_id
-        )
-    ).first()
-    
-    if existing_project:
-        return create_api_response(False, 'Project with this name already exists', None, 409)
-    
-    # Create project
+    # Create project; the (owner_id, lower(name)) unique index rejects duplicates
     project = Project(
         name=data['name'].strip(),
         description=data.get('description', '').strip(),
@@ -47,6 +68,8 @@ def create_project():
     try:
         db.session.add(project)
         db.session.commit()
+        invalidate_cache(MEMBERSHIP_CACHES, current_user_id)
+        invalidate_project_access(current_user_id)
         
         return create_api_response(
             True,
@@ -55,6 +78,9 @@ def create_project():
             201
         )
         
+    except IntegrityError:
+        db.session.rollback()
+        return create_api_response(False, 'Project with this name already exists', None, 409)
     except Exception as e:
         db.session.rollback()
         return create_api_response(False, 'Failed to create project', None, 500)
@@ -63,21 +89,38 @@ def create_project():
 @api.route('/projects', methods=['GET'])
 @jwt_required()
 @require_active_user
+@cached_response('projects', timeout=30)
 @paginate_query
 @handle_api_errors
 def get_projects(page=1, per_page=20):
-    """Get user's projects with pagination"""
+    """Get user's projects with pagination
+    
+    Pass ``cursor`` (empty for the first page, then the returned
+    ``next_cursor``) to use keyset pagination, which stays fast on deep
+    pages; ``page`` numbers are kept for existing clients.
+    """
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
     
-    # Base query for projects user has access to
-    owned_projects = db.session.query(Project).filter(Project.owner_id == current_user_id)
-    member_projects = db.session.query(Project).join(ProjectMember).filter(
-        ProjectMember.user_id == current_user_id
+    # Projects the user owns or is a member of. The membership join is keyed
+    # on the user too, so the (project_id, user_id) primary key yields
+    # at most one row per project and no DISTINCT/UNION is needed.
+    query = Project.query.outerjoin(
+        ProjectMember,
+        and_(
+            ProjectMember.project_id == Project.id,
+            ProjectMember.user_id == current_user_id
+        )
+    ).filter(
+        or_(
+            Project.owner_id == current_user_id,
+            ProjectMember.user_id.isnot(None)
+        )
     )
     
-    # Combine queries
-    query = owned_projects.union(member_projects)
+    # List rows only need the compact columns; skip the description text
+    query = query.options(load_only(
+        Project.id, Project.name, Project.status, Project.owner_id, Project.created_at
+    ))
     
     # Apply search filter if provided
     search = request.args.get('search')
@@ -95,22 +138,56 @@ def get_projects(page=1, per_page=20):
     query = query.order_by(desc(Project.created_at))
     
     # Pagination
-    projects = query.paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        items, next_cursor = paginate_keyset(query, Project.created_at, Project.id, cursor, per_page)
+        pagination = {
+            'per_page': per_page,
+            'has_next': next_cursor is not None,
+            'next_cursor': next_cursor
+        }
+    else:
+        projects = query.paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
+        items = projects.items
+        pagination = {
+            'page': projects.page,
+            'per_page': projects.per_page,
+            'total': projects.total,
+            'pages': projects.pages,
+            'has_next': projects.has_next,
+            'has_prev': projects.has_prev
+        }
     
     include_stats = request.args.get('include_stats', 'false').lower() == 'true'
+    
+    # Task counts per (project, status) for the whole page in one query
+    status_counts = defaultdict(dict)
+    if include_stats and items:
+        rows = db.session.query(
+            Task.project_id,
+            Task.status,
+            db.func.count(Task.id)
+        ).filter(
+            Task.project_id.in_([project.id for project in items])
+        ).group_by(Task.project_id, Task.status).all()
+        
+        for project_id, task_status, count in rows:
+            status_counts[project_id][task_status] = count
+    
     project_list = []
     
-    for project in projects.items:
-        project_data = project.to_dict()
+    for project in items:
+        project_data = project.to_list_dict()
         
         if include_stats:
             # Add project statistics
-            total_tasks = Task.query.filter_by(project_id=project.id).count()
-            completed_tasks = Task.query.filter_by(project_id=project.id, status='completed').count()
+            counts = status_counts[project.id]
+            total_tasks = sum(counts.values())
+            completed_tasks = counts.get('completed', 0)
             
             project_data.update({
                 'task_stats': {
@@ -127,14 +204,7 @@ def get_projects(page=1, per_page=20):
         'Projects retrieved successfully',
         {
             'projects': project_list,
-            'pagination': {
-                'page': projects.page,
-                'per_page': projects.per_page,
-                'total': projects.total,
-                'pages': projects.pages,
-                'has_next': projects.has_next,
-                'has_prev': projects.has_prev
-            }
+            'pagination': pagination
         }
     )
 
@@ -147,44 +217,30 @@ def get_project(project_id):
     """Get a specific project"""
     current_user_id = get_jwt_identity()
     
-    project = Project.query.get(project_id)
+    project = _get_project_with_people(project_id)
     if not project:
         return create_api_response(False, 'Project not found', None, 404)
     
-    user = User.query.get(current_user_id)
-    if not user.can_access_project(project_id):
+    if not _has_project_access(project, current_user_id):
         return create_api_response(False, 'Access denied', None, 403)
     
     # Get project details with statistics
     project_data = project.to_dict()
     
-    # Add member information if user is owner or member
-    if project.owner_id == current_user_id or user.can_access_project(project_id):
-        members = db.session.query(User).join(ProjectMember).filter(
-            ProjectMember.project_id == project_id
-        ).all()
-        
-        project_data['members'] = [{
-            'id': member.id,
-            'username': member.username,
-            'full_name': member.full_name,
-            'email': member.email
-        } for member in members]
-        
-        # Add owner information
-        owner = User.query.get(project.owner_id)
-        project_data['owner'] = {
-            'id': owner.id,
-            'username': owner.username,
-            'full_name': owner.full_name,
-            'email': owner.email
-        }
+    # Add member and owner information
+    project_data['members'] = [_user_summary(member) for member in project.member_users]
+    project_data['owner'] = _user_summary(project.owner)
     
-    # Add task statistics
-    total_tasks = Task.query.filter_by(project_id=project_id).count()
-    completed_tasks = Task.query.filter_by(project_id=project_id, status='completed').count()
-    in_progress_tasks = Task.query.filter_by(project_id=project_id, status='in_progress').count()
-    pending_tasks = Task.query.filter_by(project_id=project_id, status='pending').count()
+    # Add task statistics from a single per-status count
+    status_counts = dict(db.session.query(
+        Task.status,
+        db.func.count(Task.id)
+    ).filter(Task.project_id == project_id).group_by(Task.status).all())
+    
+    total_tasks = sum(status_counts.values())
+    completed_tasks = status_counts.get('completed', 0)
+    in_progress_tasks = status_counts.get('in_progress', 0)
+    pending_tasks = status_counts.get('pending', 0)
     
     project_data['task_stats'] = {
         'total': total_tasks,
@@ -223,19 +279,8 @@ def update_project(project_id):
     updated = False
     
     # Update name
+    # Duplicate names are rejected by the unique index on commit
     if 'name' in data and data['name'].strip() != project.name:
-        # Check if another project with same name exists
-        existing_project = Project.query.filter(
-            and_(
-                Project.name.ilike(data['name'].strip()),
-                Project.owner_id == current_user_id,
-                Project.id != project_id
-            )
-        ).first()
-        
-        if existing_project:
-            return create_api_response(False, 'Project with this name already exists', None, 409)
-        
         project.name = data['name'].strip()
         updated = True
     
@@ -248,18 +293,20 @@ def update_project(project_id):
     if 'status' in data:
         valid_statuses = ['active', 'inactive', 'completed', 'archived']
         if data['status'] not in valid_statuses:
-            return create_api_response(False, f'Status must be one of: {', '.join(valid_statuses)}', None, 400)
+            return create_api_response(False, f'Status must be one of: {", ".join(valid_statuses)}', None, 400)
         
         if data['status'] != project.status:
             project.status = data['status']
             updated = True
     
+    # A PUT that changes nothing returns before touching the database
     if not updated:
         return create_api_response(True, 'No changes made', {'project': project.to_dict()})
     
     try:
-        project.updated_at = datetime.utcnow()
+        # updated_at is stamped by the column's onupdate during the flush
         db.session.commit()
+        invalidate_cache(('projects', 'dashboard'), current_user_id)
         
         return create_api_response(
             True,
@@ -267,6 +314,9 @@ def update_project(project_id):
             {'project': project.to_dict()}
         )
         
+    except IntegrityError:
+        db.session.rollback()
+        return create_api_response(False, 'Project with this name already exists', None, 409)
     except Exception as e:
         db.session.rollback()
         return create_api_response(False, 'Failed to update project', None, 500)
@@ -288,7 +338,7 @@ def delete_project(project_id):
         return create_api_response(False, 'Only project owner can delete project', None, 403)
     
     # Check if project has tasks
-    task_count = Task.query.filter_by(project_id=project_id).count()
+    task_count = db.session.query(db.func.count(Task.id)).filter(Task.project_id == project_id).scalar()
     force_delete = request.args.get('force', 'false').lower() == 'true'
     
     if task_count > 0 and not force_delete:
@@ -299,9 +349,13 @@ def delete_project(project_id):
             400
         )
     
+    member_ids = [user_id for user_id, in project.members.with_entities(ProjectMember.user_id)]
+    
     try:
         db.session.delete(project)
         db.session.commit()
+        invalidate_cache(MEMBERSHIP_CACHES, current_user_id, *member_ids)
+        invalidate_project_access(current_user_id, *member_ids)
         
         return create_api_response(True, 'Project deleted successfully')
         
@@ -327,41 +381,35 @@ def add_project_member(project_id):
     if project.owner_id != current_user_id:
         return create_api_response(False, 'Only project owner can add members', None, 403)
     
-    # Check if user exists
-    user = User.query.get(data['user_id'])
-    if not user:
-        return create_api_response(False, 'User not found', None, 404)
-    
-    # Check if user is already a member
-    existing_member = ProjectMember.query.filter_by(
-        project_id=project_id,
-        user_id=data['user_id']
-    ).first()
-    
-    if existing_member:
-        return create_api_response(False, 'User is already a project member', None, 409)
-    
     # Don't add owner as member
     if data['user_id'] == project.owner_id:
         return create_api_response(False, 'Project owner cannot be added as member', None, 400)
     
+    # Insert directly; the (project_id, user_id) primary key and the
+    # user foreign key reject duplicates and unknown users
     try:
         member = ProjectMember(project_id=project_id, user_id=data['user_id'])
         db.session.add(member)
         db.session.commit()
+        invalidate_cache(MEMBERSHIP_CACHES, current_user_id, data['user_id'])
+        invalidate_project_access(data['user_id'])
         
         return create_api_response(
             True,
             'Member added successfully',
-            {'member': {
-                'id': user.id,
-                'username': user.username,
-                'full_name': user.full_name,
-                'email': user.email
-            }},
+            {'member': _user_summary(member.user)},
             201
         )
         
+    except IntegrityError as e:
+        db.session.rollback()
+        constraint = getattr(getattr(e.orig, 'diag', None), 'constraint_name', None) or str(e.orig)
+        if 'project_members_pkey' in constraint:
+            return create_api_response(False, 'User is already a project member', None, 409)
+        # PostgreSQL's default name for the unnamed user_id foreign key
+        if 'project_members_user_id_fkey' in constraint:
+            return create_api_response(False, 'User not found', None, 404)
+        return create_api_response(False, 'Failed to add member', None, 500)
     except Exception as e:
         db.session.rollback()
         return create_api_response(False, 'Failed to add member', None, 500)
@@ -382,18 +430,20 @@ def remove_project_member(project_id, user_id):
     if project.owner_id != current_user_id:
         return create_api_response(False, 'Only project owner can remove members', None, 403)
     
-    # Find and remove membership
-    member = ProjectMember.query.filter_by(
-        project_id=project_id,
-        user_id=user_id
-    ).first()
-    
-    if not member:
-        return create_api_response(False, 'User is not a project member', None, 404)
-    
     try:
-        db.session.delete(member)
+        # Remove the membership directly; the row count says whether there was one
+        removed = ProjectMember.query.filter_by(
+            project_id=project_id,
+            user_id=user_id
+        ).delete(synchronize_session=False)
+        
+        if not removed:
+            db.session.rollback()
+            return create_api_response(False, 'User is not a project member', None, 404)
+        
         db.session.commit()
+        invalidate_cache(MEMBERSHIP_CACHES, current_user_id, user_id)
+        invalidate_project_access(user_id)
         
         return create_api_response(True, 'Member removed successfully')
         
@@ -410,37 +460,18 @@ def get_project_members(project_id):
     """Get project members"""
     current_user_id = get_jwt_identity()
     
-    project = Project.query.get(project_id)
+    project = _get_project_with_people(project_id)
     if not project:
         return create_api_response(False, 'Project not found', None, 404)
     
-    user = User.query.get(current_user_id)
-    if not user.can_access_project(project_id):
+    if not _has_project_access(project, current_user_id):
         return create_api_response(False, 'Access denied', None, 403)
     
-    # Get all members
-    members = db.session.query(User).join(ProjectMember).filter(
-        ProjectMember.project_id == project_id
-    ).all()
-    
-    # Get owner
-    owner = User.query.get(project.owner_id)
-    
     return create_api_response(
         True,
         'Project members retrieved successfully',
         {
-            'owner': {
-                'id': owner.id,
-                'username': owner.username,
-                'full_name': owner.full_name,
-                'email': owner.email
-            },
-            'members': [{
-                'id': member.id,
-                'username': member.username,
-                'full_name': member.full_name,
-                'email': member.email
-            } for member in members]
+            'owner': _user_summary(project.owner),
+            'members': [_user_summary(member) for member in project.member_users]
         }
     )
\ No newline at end of file
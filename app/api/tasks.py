@@ -1,17 +1,149 @@
+import math
 from datetime import datetime
-from flask import request, jsonify
+from flask import request, jsonify, g, current_app, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_, and_, desc, asc
+from sqlalchemy import or_, and_, desc, asc, exists, update
+from sqlalchemy.orm import selectinload
 
 from app import db
 from app.api import api
 from app.models.task import Task
 from app.models.project import Project
+from app.models.project_member import ProjectMember
 from app.models.user import User
 from app.models.category import Category, TaskCategory
 from app.utils.decorators import handle_api_errors, require_active_user, paginate_query, validate_json_fields
 from app.utils.validators import validate_task_status, validate_task_priority, validate_due_date
-from app.utils.helpers import create_api_response, build_search_filters
+from app.utils.helpers import (
+    create_api_response, build_search_filters, paginate_keyset, keyset_page_query, encode_cursor
+)
+from app.utils.cache import invalidate_cache
+from app.utils.json_provider import orjson_dumps
+
+
+# Sort columns that, with Task.id as a tiebreaker, can be keyset paginated
+KEYSET_SORT_COLUMNS = {'created_at': Task.created_at, 'updated_at': Task.updated_at}
+
+# Pages larger than this are streamed from a server-side cursor in batches of this size
+TASK_YIELD_PER = 50
+
+
+def _stream_task_page(query, page, per_page, keyset_column, cursor, descending,
+                      include_details, include_total):
+    """Stream a large task page as JSON, serializing one yield_per batch at a time
+    
+    Only the current batch of tasks is held while the body is written. The
+    pagination block comes after the list, since the next cursor depends on
+    the last row streamed.
+    """
+    if keyset_column is not None:
+        rows = keyset_page_query(query, keyset_column, Task.id, cursor, per_page, descending)
+        pagination = {'per_page': per_page}
+        if include_total:
+            pagination['total'] = query.order_by(None).count()
+    else:
+        total = query.order_by(None).count()
+        pages = math.ceil(total / per_page) if total else 0
+        rows = query.limit(per_page).offset((page - 1) * per_page)
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'total': total,
+            'pages': pages,
+            'has_next': page < pages,
+            'has_prev': page > 1
+        }
+    
+    def encode(batch, now):
+        Task.preload_counts(batch)
+        return b','.join(
+            orjson_dumps(task.to_dict_fast(include_categories=include_details, now=now))
+            for task in batch
+        )
+    
+    def generate():
+        now = datetime.utcnow()
+        yield b'{"success":true,"message":"Tasks retrieved successfully","data":{"tasks":['
+        
+        separator = b''
+        batch = []
+        emitted = 0
+        last_task = None
+        has_more = False
+        for task in rows:
+            if emitted == per_page:
+                has_more = True
+                break
+            batch.append(task)
+            emitted += 1
+            last_task = task
+            if len(batch) == TASK_YIELD_PER:
+                yield separator + encode(batch, now)
+                separator = b','
+                batch = []
+        if batch:
+            yield separator + encode(batch, now)
+        
+        if keyset_column is not None:
+            pagination['has_next'] = has_more
+            pagination['next_cursor'] = (
+                encode_cursor(getattr(last_task, keyset_column.key), last_task.id) if has_more else None
+            )
+        yield b'],"pagination":' + orjson_dumps(pagination) + b'}}'
+    
+    return current_app.response_class(stream_with_context(generate()), mimetype='application/json')
+
+
+def _load_task(task_id, with_categories=False):
+    """Fetch a task by primary key, optionally selectin-loading its categories"""
+    options = [selectinload(Task.categories)] if with_categories else []
+    return db.session.get(Task, task_id, options=options)
+
+
+def _assignee_access(user_id, project_id):
+    """Return (user exists, user can access project) for a prospective assignee in one query"""
+    return db.session.query(
+        exists().where(User.id == user_id),
+        or_(
+            exists().where(and_(Project.id == project_id, Project.owner_id == user_id)),
+            exists().where(and_(ProjectMember.project_id == project_id, ProjectMember.user_id == user_id))
+        )
+    ).one()
+
+
+def _owned_category_ids(category_ids, user_id):
+    """Return which of the given category ids belong to the user, in one query"""
+    if not category_ids:
+        return set()
+    return {
+        category_id for category_id, in db.session.query(Category.id).filter(
+            Category.id.in_(category_ids),
+            Category.user_id == user_id
+        )
+    }
+
+
+def _attach_owned_categories(task, category_ids, user_id):
+    """Link the task to those of the categories the user owns with one multi-row INSERT
+    
+    The task must have no category links yet, so no per-row duplicate check is needed.
+    """
+    owned_ids = _owned_category_ids(category_ids, user_id)
+    rows = [
+        {'task_id': task.id, 'category_id': category_id}
+        for category_id in dict.fromkeys(category_ids) if category_id in owned_ids
+    ]
+    if rows:
+        db.session.execute(TaskCategory.__table__.insert(), rows)
+
+
+def _invalidate_task_caches(task, current_user_id, *other_user_ids):
+    """Drop cached responses that summarize the task for the users it involves"""
+    invalidate_cache(('category_stats', 'projects'), current_user_id)
+    invalidate_cache(
+        ('user_stats', 'dashboard'),
+        current_user_id, task.created_by, task.assigned_to, *other_user_ids
+    )
 
 
 @api.route('/tasks', methods=['POST'])
@@ -32,16 +164,15 @@ def create_task():
     if not project:
         return create_api_response(False, 'Project not found', None, 404)
     
-    user = User.query.get(current_user_id)
-    if not user.can_access_project(data['project_id']):
+    if not g.current_user.can_access_project(data['project_id']):
         return create_api_response(False, 'Access denied to project', None, 403)
     
     # Validate assigned user exists and has access to project
     if data.get('assigned_to'):
-        assigned_user = User.query.get(data['assigned_to'])
-        if not assigned_user:
+        assignee_exists, assignee_has_access = _assignee_access(data['assigned_to'], data['project_id'])
+        if not assignee_exists:
             return create_api_response(False, 'Assigned user not found', None, 404)
-        if not assigned_user.can_access_project(data['project_id']):
+        if not assignee_has_access:
             return create_api_response(False, 'Assigned user does not have access to project', None, 400)
     
     # Validate priority
@@ -72,12 +203,10 @@ def create_task():
         
         # Add categories if provided
         if data.get('category_ids'):
-            for category_id in data['category_ids']:
-                category = Category.query.filter_by(id=category_id, user_id=current_user_id).first()
-                if category:
-                    task.add_category(category_id)
+            _attach_owned_categories(task, data['category_ids'], current_user_id)
         
         db.session.commit()
+        _invalidate_task_caches(task, current_user_id)
         
         return create_api_response(
             True,
@@ -97,20 +226,25 @@ def create_task():
 @paginate_query
 @handle_api_errors
 def get_tasks(page=1, per_page=20):
-    """Get tasks with filtering and pagination"""
+    """Get tasks with filtering and pagination
+    
+    Pass ``cursor`` (empty for the first page, then the returned
+    ``next_cursor``) to use keyset pagination when sorting by ``created_at``
+    or ``updated_at``; the total is then only counted with
+    ``include_total=true``. Other sorts fall back to ``page`` numbers.
+    """
     current_user_id = get_jwt_identity()
     
     # Build query with user access restrictions
-    query = db.session.query(Task).join(Project).filter(
-        or_(
-            Project.owner_id == current_user_id,
-            Project.id.in_(
-                db.session.query(Project.id)
-                .join(ProjectMember)
-                .filter(ProjectMember.user_id == current_user_id)
-            )
+    is_member = exists().where(
+        and_(
+            ProjectMember.project_id == Project.id,
+            ProjectMember.user_id == current_user_id
         )
     )
+    query = db.session.query(Task).join(Project).filter(
+        or_(Project.owner_id == current_user_id, is_member)
+    )
     
     # Apply filters
     project_id = request.args.get('project_id', type=int)
@@ -177,44 +311,65 @@ def get_tasks(page=1, per_page=20):
     sort_order = request.args.get('sort_order', 'desc').lower()
     
     if sort_by == 'priority':
-        # Custom priority sorting
-        priority_order = db.case(
-            (Task.priority == 'critical', 4),
-            (Task.priority == 'high', 3),
-            (Task.priority == 'medium', 2),
-            (Task.priority == 'low', 1)
-        )
-        query = query.order_by(desc(priority_order) if sort_order == 'desc' else asc(priority_order))
+        # Priorities sort by their stored rank rather than alphabetically
+        query = query.order_by(desc(Task.priority_rank) if sort_order == 'desc' else asc(Task.priority_rank))
     elif hasattr(Task, sort_by):
         sort_column = getattr(Task, sort_by)
         query = query.order_by(desc(sort_column) if sort_order == 'desc' else asc(sort_column))
     
+    include_details = request.args.get('include_details', 'false').lower() == 'true'
+    query = query.options(*Task.list_loader_options(include_categories=include_details))
+    if per_page > TASK_YIELD_PER:
+        # Large pages are streamed; categories are then selectin-loaded per batch
+        query = query.yield_per(TASK_YIELD_PER)
+    
     # Pagination
-    tasks = query.paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
+    cursor = request.args.get('cursor')
+    keyset_column = KEYSET_SORT_COLUMNS.get(sort_by) if cursor is not None else None
+    include_total = request.args.get('include_total', 'false').lower() == 'true'
+    
+    if per_page > TASK_YIELD_PER:
+        return _stream_task_page(
+            query, page, per_page, keyset_column, cursor, sort_order == 'desc',
+            include_details, include_total
+        )
     
-    include_details = request.args.get('include_details', 'false').lower() == 'true'
+    if keyset_column is not None:
+        items, next_cursor = paginate_keyset(
+            query, keyset_column, Task.id, cursor, per_page,
+            descending=sort_order == 'desc'
+        )
+        pagination = {
+            'per_page': per_page,
+            'has_next': next_cursor is not None,
+            'next_cursor': next_cursor
+        }
+        if include_total:
+            pagination['total'] = query.order_by(None).count()
+    else:
+        tasks = query.paginate(
+            page=page,
+            per_page=per_page,
+            error_out=False
+        )
+        items = tasks.items
+        pagination = {
+            'page': tasks.page,
+            'per_page': tasks.per_page,
+            'total': tasks.total,
+            'pages': tasks.pages,
+            'has_next': tasks.has_next,
+            'has_prev': tasks.has_prev
+        }
+    Task.preload_counts(items)
+    now = datetime.utcnow()
     
     return create_api_response(
         True,
         'Tasks retrieved successfully',
         {
-            'tasks': [task.to_dict(
-                include_categories=include_details,
-                include_comments=False,
-                include_attachments=False
-            ) for task in tasks.items],
-            'pagination': {
-                'page': tasks.page,
-                'per_page': tasks.per_page,
-                'total': tasks.total,
-                'pages': tasks.pages,
-                'has_next': tasks.has_next,
-                'has_prev': tasks.has_prev
-            }
+            'tasks': [task.to_dict_fast(include_categories=include_details, now=now) for task in items],
+            'pagination': pagination
         }
     )
 
@@ -227,7 +382,7 @@ def get_task(task_id):
     """Get a specific task"""
     current_user_id = get_jwt_identity()
     
-    task = Task.query.get(task_id)
+    task = _load_task(task_id, with_categories=True)
     if not task:
         return create_api_response(False, 'Task not found', None, 404)
     
@@ -262,7 +417,8 @@ def update_task(task_id):
     current_user_id = get_jwt_identity()
     data = request.get_json()
     
-    task = Task.query.get(task_id)
+    # Replaced categories are reloaded after the update, so only preload them when kept
+    task = _load_task(task_id, with_categories='category_ids' not in data)
     if not task:
         return create_api_response(False, 'Task not found', None, 404)
     
@@ -299,12 +455,13 @@ def update_task(task_id):
             updated = True
     
     # Update assigned user
+    previous_assignee = task.assigned_to
     if 'assigned_to' in data:
         if data['assigned_to'] is not None:
-            assigned_user = User.query.get(data['assigned_to'])
-            if not assigned_user:
+            assignee_exists, assignee_has_access = _assignee_access(data['assigned_to'], task.project_id)
+            if not assignee_exists:
                 return create_api_response(False, 'Assigned user not found', None, 404)
-            if not assigned_user.can_access_project(task.project_id):
+            if not assignee_has_access:
                 return create_api_response(False, 'Assigned user does not have access to project', None, 400)
         
         if data['assigned_to'] != task.assigned_to:
@@ -325,17 +482,14 @@ def update_task(task_id):
     # Update categories
     if 'category_ids' in data:
         # Remove existing categories
-        existing_categories = TaskCategory.query.filter_by(task_id=task_id).all()
-        for tc in existing_categories:
-            db.session.delete(tc)
+        TaskCategory.query.filter_by(task_id=task_id).delete(synchronize_session=False)
         
         # Add new categories
         if data['category_ids']:
-            for category_id in data['category_ids']:
-                category = Category.query.filter_by(id=category_id, user_id=current_user_id).first()
-                if category:
-                    task.add_category(category_id)
+            _attach_owned_categories(task, data['category_ids'], current_user_id)
         
+        # Both statements bypass the ORM, so reload categories on next access
+        db.session.expire(task, ['categories'])
         updated = True
     
     if not updated:
@@ -346,6 +500,7 @@ def update_task(task_id):
             task.updated_at = datetime.utcnow()
         
         db.session.commit()
+        _invalidate_task_caches(task, current_user_id, previous_assignee)
         
         return create_api_response(
             True,
@@ -366,7 +521,7 @@ def delete_task(task_id):
     """Delete a task"""
     current_user_id = get_jwt_identity()
     
-    task = Task.query.get(task_id)
+    task = _load_task(task_id)
     if not task:
         return create_api_response(False, 'Task not found', None, 404)
     
@@ -376,6 +531,7 @@ def delete_task(task_id):
     try:
         db.session.delete(task)
         db.session.commit()
+        _invalidate_task_caches(task, current_user_id)
         
         return create_api_response(True, 'Task deleted successfully')
         
@@ -394,7 +550,7 @@ def assign_task(task_id):
     current_user_id = get_jwt_identity()
     data = request.get_json()
     
-    task = Task.query.get(task_id)
+    task = _load_task(task_id)
     if not task:
         return create_api_response(False, 'Task not found', None, 404)
     
@@ -402,16 +558,18 @@ def assign_task(task_id):
         return create_api_response(False, 'Permission denied', None, 403)
     
     # Validate assigned user
-    assigned_user = User.query.get(data['user_id'])
-    if not assigned_user:
+    assignee_exists, assignee_has_access = _assignee_access(data['user_id'], task.project_id)
+    if not assignee_exists:
         return create_api_response(False, 'User not found', None, 404)
     
-    if not assigned_user.can_access_project(task.project_id):
+    if not assignee_has_access:
         return create_api_response(False, 'User does not have access to project', None, 400)
     
     try:
+        previous_assignee = task.assigned_to
         task.assign_to_user(data['user_id'])
         db.session.commit()
+        _invalidate_task_caches(task, current_user_id, previous_assignee)
         
         return create_api_response(
             True,
@@ -432,16 +590,28 @@ def unassign_task(task_id):
     """Unassign task from current user"""
     current_user_id = get_jwt_identity()
     
-    task = Task.query.get(task_id)
-    if not task:
-        return create_api_response(False, 'Task not found', None, 404)
-    
-    if not task.can_user_edit(current_user_id):
-        return create_api_response(False, 'Permission denied', None, 403)
+    # One UPDATE both checks edit permission and clears the assignee. The
+    # self-join on ``previous`` returns the row as it was before the update,
+    # which PostgreSQL uses to report who was unassigned.
+    previous = Task.__table__.alias('previous')
+    stmt = update(Task).where(
+        Task.id == task_id,
+        Task.id == previous.c.id,
+        Task.editable_by(current_user_id)
+    ).values(
+        assigned_to=None,
+        updated_at=datetime.utcnow()
+    ).returning(Task, previous.c.assigned_to)
     
     try:
-        task.unassign()
+        row = db.session.execute(stmt).one_or_none()
+        if row is None:
+            db.session.rollback()
+            return create_api_response(False, 'Task not found or permission denied', None, 404)
+        
+        task, previous_assignee = row
         db.session.commit()
+        _invalidate_task_caches(task, current_user_id, previous_assignee)
         
         return create_api_response(
             True,
@@ -481,14 +651,9 @@ def get_my_tasks(page=1, per_page=20):
     if priority:
         query = query.filter(Task.priority == priority)
     
-    # Sort by priority and creation date
-    priority_order = db.case(
-        (Task.priority == 'critical', 4),
-        (Task.priority == 'high', 3),
-        (Task.priority == 'medium', 2),
-        (Task.priority == 'low', 1)
-    )
-    query = query.order_by(desc(priority_order), desc(Task.created_at))
+    # Sort by priority and creation date, matching the ix_task_cat_order index
+    query = query.order_by(desc(Task.priority_rank), desc(Task.created_at))
+    query = query.options(*Task.list_loader_options(include_categories=True))
     
     # Pagination
     tasks = query.paginate(
@@ -496,12 +661,14 @@ def get_my_tasks(page=1, per_page=20):
         per_page=per_page,
         error_out=False
     )
+    Task.preload_counts(tasks.items)
+    now = datetime.utcnow()
     
     return create_api_response(
         True,
         'My tasks retrieved successfully',
         {
-            'tasks': [task.to_dict(include_categories=True) for task in tasks.items],
+            'tasks': [task.to_dict_fast(include_categories=True, now=now) for task in tasks.items],
             'pagination': {
                 'page': tasks.page,
                 'per_page': tasks.per_page,
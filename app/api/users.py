@@ -1,6 +1,7 @@
 from flask import request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from sqlalchemy import or_, and_, desc
+from sqlalchemy import or_, and_, desc, bindparam, exists, func, select
+from sqlalchemy.orm import aliased
 
 from app import db
 from app.api import api
@@ -9,16 +10,66 @@ from app.models.project import Project
 from app.models.project_member import ProjectMember
 from app.models.task import Task
 from app.utils.decorators import handle_api_errors, require_active_user, paginate_query
-from app.utils.helpers import create_api_response, build_search_filters, mask_email
+from app.utils.helpers import create_api_response, build_search_filters, mask_email, paginate_keyset
+from app.utils.cache import cached_response
+
+
+# Statistics queries are built once with a user_id bind parameter, so every
+# request reuses the same statement and its entry in the compiled cache
+_assigned = Task.assigned_to == bindparam('user_id')
+_created = Task.created_by == bindparam('user_id')
+
+USER_TASK_STATS = select(
+    func.count().filter(_assigned).label('assigned_total'),
+    func.count().filter(and_(_assigned, Task.status == 'completed')).label('assigned_completed'),
+    func.count().filter(and_(_assigned, Task.status == 'in_progress')).label('assigned_in_progress'),
+    func.count().filter(and_(_assigned, Task.status == 'pending')).label('assigned_pending'),
+    func.count().filter(
+        and_(
+            _assigned,
+            Task.due_date < func.now(),
+            Task.status.notin_(['completed', 'cancelled'])
+        )
+    ).label('overdue'),
+    func.count().filter(_created).label('created_total'),
+    func.count().filter(and_(_created, Task.status == 'completed')).label('created_completed')
+).select_from(Task).where(or_(_assigned, _created))
+
+USER_PROJECT_STATS = select(
+    select(func.count()).select_from(Project)
+    .where(Project.owner_id == bindparam('user_id')).scalar_subquery(),
+    select(func.count()).select_from(ProjectMember)
+    .where(ProjectMember.user_id == bindparam('user_id')).scalar_subquery()
+)
+
+_open_task = Task.status.notin_(['completed', 'cancelled'])
+
+DASHBOARD_TASK_COUNTS = select(
+    func.count().label('total'),
+    func.count().filter(and_(Task.due_date < func.now(), _open_task)).label('overdue'),
+    func.count().filter(
+        and_(
+            Task.due_date >= bindparam('now'),
+            Task.due_date <= bindparam('upcoming_until'),
+            _open_task
+        )
+    ).label('upcoming')
+).select_from(Task).where(Task.assigned_to == bindparam('user_id'))
 
 
 @api.route('/users/search', methods=['GET'])
 @jwt_required()
 @require_active_user
+@cached_response('user_search', timeout=120)
 @paginate_query
 @handle_api_errors
 def search_users(page=1, per_page=20):
-    """Search for users (for adding to projects)"""
+    """Search for users (for adding to projects)
+    
+    Pass ``cursor`` (empty for the first page, then the returned
+    ``next_cursor``) for keyset pagination by username. The total match
+    count is only included with ``include_total=true``.
+    """
     current_user_id = get_jwt_identity()
     
     # Get search query
@@ -43,32 +94,51 @@ def search_users(page=1, per_page=20):
     # Exclude users already in specific project if project_id provided
     exclude_project_id = request.args.get('exclude_project_id', type=int)
     if exclude_project_id:
-        # Get existing member IDs
-        existing_member_ids = db.session.query(ProjectMember.user_id).filter_by(
-            project_id=exclude_project_id
-        ).subquery()
+        # Only the owner id is needed, not the whole project row
+        owner_id = db.session.query(Project.owner_id).filter(
+            Project.id == exclude_project_id
+        ).scalar()
+        if owner_id is None:
+            return create_api_response(False, 'Project not found', None, 404)
         
-        # Get project owner ID
-        project = Project.query.get(exclude_project_id)
-        exclude_ids = [project.owner_id] if project else []
-        
-        # Add existing members to exclude list
+        # Exclude the owner and existing members
         query = query.filter(
-            and_(
-                User.id.notin_(existing_member_ids),
-                User.id.notin_(exclude_ids)
+            User.id != owner_id,
+            ~exists().where(
+                and_(
+                    ProjectMember.user_id == User.id,
+                    ProjectMember.project_id == exclude_project_id
+                )
             )
         )
     
-    # Sort by username
-    query = query.order_by(User.username.asc())
+    # Pagination; the COUNT(*) over a substring match costs as much as the
+    # search itself, so the total is only computed when asked for
+    cursor = request.args.get('cursor')
+    if cursor is not None:
+        items, next_cursor = paginate_keyset(
+            query, User.username, User.id, cursor, per_page, descending=False
+        )
+        pagination = {
+            'per_page': per_page,
+            'has_next': next_cursor is not None,
+            'next_cursor': next_cursor
+        }
+    else:
+        items = query.order_by(User.username.asc()).offset(
+            (page - 1) * per_page
+        ).limit(per_page + 1).all()
+        has_next = len(items) > per_page
+        items = items[:per_page]
+        pagination = {
+            'page': page,
+            'per_page': per_page,
+            'has_next': has_next,
+            'has_prev': page > 1
+        }
     
-    # Pagination
-    users = query.paginate(
-        page=page,
-        per_page=per_page,
-        error_out=False
-    )
+    if request.args.get('include_total', 'false').lower() == 'true':
+        pagination['total'] = query.count()
     
     return create_api_response(
         True,
@@ -79,15 +149,8 @@ def search_users(page=1, per_page=20):
                 'username': user.username,
                 'full_name': user.full_name,
                 'email': mask_email(user.email)  # Mask email for privacy
-            } for user in users.items],
-            'pagination': {
-                'page': users.page,
-                'per_page': users.per_page,
-                'total': users.total,
-                'pages': users.pages,
-                'has_next': users.has_next,
-                'has_prev': users.has_prev
-            }
+            } for user in items],
+            'pagination': pagination
         }
     )
 
@@ -100,7 +163,7 @@ def get_user_profile(user_id):
     """Get user profile (limited information for privacy)"""
     current_user_id = get_jwt_identity()
     
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user or not user.is_active:
         return create_api_response(False, 'User not found', None, 404)
     
@@ -111,38 +174,36 @@ def get_user_profile(user_id):
     if user_id == current_user_id:
         can_view = True
     else:
-        # Check if they share any projects
-        shared_projects = db.session.query(Project.id).filter(
+        # Check if they share any projects: both members, or one owns and the other is a member
+        current_membership = aliased(ProjectMember)
+        target_membership = aliased(ProjectMember)
+        both_members = db.session.query(current_membership.project_id).join(
+            target_membership,
+            current_membership.project_id == target_membership.project_id
+        ).filter(
+            current_membership.user_id == current_user_id,
+            target_membership.user_id == user_id
+        )
+        owner_and_member = db.session.query(Project.id).filter(
             or_(
-                # Projects owned by current user where target user is member
                 and_(
                     Project.owner_id == current_user_id,
-                    Project.id.in_(
-                        db.session.query(ProjectMember.project_id)
-                        .filter_by(user_id=user_id)
-                    )
+                    exists().where(and_(
+                        ProjectMember.project_id == Project.id,
+                        ProjectMember.user_id == user_id
+                    ))
                 ),
-                # Projects owned by target user where current user is member
                 and_(
                     Project.owner_id == user_id,
-                    Project.id.in_(
-                        db.session.query(ProjectMember.project_id)
-                        .filter_by(user_id=current_user_id)
-                    )
-                ),
-                # Projects where both are members
-                Project.id.in_(
-                    db.session.query(ProjectMember.project_id)
-                    .filter_by(user_id=current_user_id)
-                    .intersect(
-                        db.session.query(ProjectMember.project_id)
-                        .filter_by(user_id=user_id)
-                    )
+                    exists().where(and_(
+                        ProjectMember.project_id == Project.id,
+                        ProjectMember.user_id == current_user_id
+                    ))
                 )
             )
-        ).first()
+        )
         
-        can_view = shared_projects is not None
+        can_view = db.session.query(both_members.union_all(owner_and_member).exists()).scalar()
     
     if not can_view:
         # Return limited public profile
@@ -186,6 +247,7 @@ def get_user_profile(user_id):
 @api.route('/users/<int:user_id>/stats', methods=['GET'])
 @jwt_required()
 @require_active_user
+@cached_response('user_stats', timeout=300)
 @handle_api_errors
 def get_user_stats(user_id):
     """Get user statistics (only for current user or collaborators)"""
@@ -194,48 +256,24 @@ def get_user_stats(user_id):
     if user_id != current_user_id:
         return create_api_response(False, 'Access denied', None, 403)
     
-    user = User.query.get(user_id)
+    user = db.session.get(User, user_id)
     if not user or not user.is_active:
         return create_api_response(False, 'User not found', None, 404)
     
-    # Get task statistics
-    total_tasks_assigned = Task.query.filter_by(assigned_to=user_id).count()
-    total_tasks_created = Task.query.filter_by(created_by=user_id).count()
-    
-    completed_tasks_assigned = Task.query.filter_by(
-        assigned_to=user_id,
-        status='completed'
-    ).count()
-    
-    completed_tasks_created = Task.query.filter_by(
-        created_by=user_id,
-        status='completed'
-    ).count()
-    
-    in_progress_tasks = Task.query.filter_by(
-        assigned_to=user_id,
-        status='in_progress'
-    ).count()
+    # Get task and project statistics
+    task_counts = db.session.execute(USER_TASK_STATS, {'user_id': user_id}).one()
     
-    pending_tasks = Task.query.filter_by(
-        assigned_to=user_id,
-        status='pending'
-    ).count()
+    total_tasks_assigned = task_counts.assigned_total
+    total_tasks_created = task_counts.created_total
+    completed_tasks_assigned = task_counts.assigned_completed
+    completed_tasks_created = task_counts.created_completed
+    in_progress_tasks = task_counts.assigned_in_progress
+    pending_tasks = task_counts.assigned_pending
+    overdue_tasks = task_counts.overdue
     
-    # Get overdue tasks
-    overdue_tasks = Task.query.filter(
-        and_(
-            Task.assigned_to == user_id,
-            Task.due_date < db.func.now(),
-            Task.status.notin_(['completed', 'cancelled'])
-        )
-    ).count()
-    
-    # Get project statistics
-    owned_projects = Project.query.filter_by(owner_id=user_id).count()
-    member_projects = db.session.query(Project).join(ProjectMember).filter(
-        ProjectMember.user_id == user_id
-    ).count()
+    owned_projects, member_projects = db.session.execute(
+        USER_PROJECT_STATS, {'user_id': user_id}
+    ).one()
     
     return create_api_response(
         True,
@@ -269,6 +307,7 @@ def get_user_stats(user_id):
 @api.route('/users/me/dashboard', methods=['GET'])
 @jwt_required()
 @require_active_user
+@cached_response('dashboard', timeout=60)
 @handle_api_errors
 def get_dashboard_data():
     """Get dashboard data for current user"""
@@ -277,7 +316,7 @@ def get_dashboard_data():
     # Get recent tasks assigned to user
     recent_tasks = Task.query.filter(
         Task.assigned_to == current_user_id
-    ).order_by(desc(Task.updated_at)).limit(5).all()
+    ).order_by(desc(Task.updated_at)).options(*Task.list_loader_options()).limit(5).all()
     
     # Get overdue tasks
     overdue_tasks = Task.query.filter(
@@ -286,48 +325,52 @@ def get_dashboard_data():
             Task.due_date < db.func.now(),
             Task.status.notin_(['completed', 'cancelled'])
         )
-    ).order_by(Task.due_date.asc()).limit(5).all()
+    ).order_by(Task.due_date.asc()).options(*Task.list_loader_options()).limit(5).all()
     
     # Get upcoming tasks (due in next 7 days)
     from datetime import datetime, timedelta
-    upcoming_date = datetime.utcnow() + timedelta(days=7)
+    now = datetime.utcnow()
+    upcoming_date = now + timedelta(days=7)
     
     upcoming_tasks = Task.query.filter(
         and_(
             Task.assigned_to == current_user_id,
             Task.due_date <= upcoming_date,
-            Task.due_date >= datetime.utcnow(),
+            Task.due_date >= now,
             Task.status.notin_(['completed', 'cancelled'])
         )
-    ).order_by(Task.due_date.asc()).limit(5).all()
+    ).order_by(Task.due_date.asc()).options(*Task.list_loader_options()).limit(5).all()
     
-    # Get recent projects
-    recent_projects_owned = Project.query.filter_by(
-        owner_id=current_user_id
-    ).order_by(desc(Project.updated_at)).limit(3).all()
+    Task.preload_counts(recent_tasks + overdue_tasks + upcoming_tasks)
     
-    recent_projects_member = db.session.query(Project).join(ProjectMember).filter(
-        ProjectMember.user_id == current_user_id
-    ).order_by(desc(Project.updated_at)).limit(3).all()
+    # The lists above stop at 5; the counts cover every assigned task
+    task_counts = db.session.execute(
+        DASHBOARD_TASK_COUNTS,
+        {'user_id': current_user_id, 'now': now, 'upcoming_until': upcoming_date}
+    ).one()
     
-    # Combine and limit projects
-    all_recent_projects = list(set(recent_projects_owned + recent_projects_member))
-    all_recent_projects.sort(key=lambda p: p.updated_at, reverse=True)
-    recent_projects = all_recent_projects[:5]
+    # Get recent projects the user owns or is a member of
+    accessible_projects = Project.query.filter_by(owner_id=current_user_id).union(
+        db.session.query(Project).join(ProjectMember).filter(
+            ProjectMember.user_id == current_user_id
+        )
+    )
+    recent_projects = accessible_projects.order_by(desc(Project.updated_at)).limit(5).all()
+    total_projects = accessible_projects.order_by(None).count()
     
     return create_api_response(
         True,
         'Dashboard data retrieved',
         {
-            'recent_tasks': [task.to_dict() for task in recent_tasks],
-            'overdue_tasks': [task.to_dict() for task in overdue_tasks],
-            'upcoming_tasks': [task.to_dict() for task in upcoming_tasks],
+            'recent_tasks': [task.to_dict_fast(now=now) for task in recent_tasks],
+            'overdue_tasks': [task.to_dict_fast(now=now) for task in overdue_tasks],
+            'upcoming_tasks': [task.to_dict_fast(now=now) for task in upcoming_tasks],
             'recent_projects': [project.to_dict() for project in recent_projects],
             'quick_stats': {
-                'overdue_count': len(overdue_tasks),
-                'upcoming_count': len(upcoming_tasks),
-                'total_assigned_tasks': Task.query.filter_by(assigned_to=current_user_id).count(),
-                'total_projects': len(all_recent_projects)
+                'overdue_count': task_counts.overdue,
+                'upcoming_count': task_counts.upcoming,
+                'total_assigned_tasks': task_counts.total,
+                'total_projects': total_projects
             }
         }
     )
\ No newline at end of file
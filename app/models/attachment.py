@@ -1,5 +1,16 @@
-from datetime import datetime
 from app import db
+from app.utils.helpers import FILE_SIZE_UNITS, request_cached, utcnow
+
+_IMAGE_MIME_TYPES = frozenset({
+    'image/jpeg', 'image/png', 'image/gif', 'image/bmp', 'image/webp'
+})
+_DOCUMENT_MIME_TYPES = frozenset({
+    'application/pdf', 'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/vnd.ms-excel',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'text/plain', 'text/csv'
+})
 
 
 class Attachment(db.Model):
@@ -12,17 +23,23 @@ class Attachment(db.Model):
     file_path = db.Column(db.String(500), nullable=False)  # Full path to file
     file_size = db.Column(db.Integer, nullable=False)  # File size in bytes
     mime_type = db.Column(db.String(100), nullable=False)  # File MIME type
-    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False, index=True)
-    uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    content_hash = db.Column(db.String(64), nullable=True)  # SHA-256 of file contents
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
+    uploaded_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
 
     __table_args__ = (
         db.Index('idx_attachment_task', 'task_id'),
-        db.Index('idx_attachment_uploader', 'uploaded_by'),
-        db.Index('idx_attachment_created', 'created_at')
+        db.Index('idx_attachment_created', 'created_at'),
+        db.Index('ix_att_user_created', 'uploaded_by', db.text('created_at DESC')),
+        db.Index('ix_att_mime', 'mime_type', postgresql_ops={'mime_type': 'text_pattern_ops'}),
+        db.Index('idx_attachment_content_hash', 'content_hash')
     )
 
-    def __init__(self, filename, original_filename, file_path, file_size, mime_type, task_id, uploaded_by):
+    __mapper_args__ = {'eager_defaults': True}
+
+    def __init__(self, filename, original_filename, file_path, file_size, mime_type, task_id, uploaded_by,
+                 content_hash=None):
         self.filename = filename
         self.original_filename = original_filename
         self.file_path = file_path
@@ -30,47 +47,38 @@ class Attachment(db.Model):
         self.mime_type = mime_type
         self.task_id = task_id
         self.uploaded_by = uploaded_by
+        self.content_hash = content_hash
 
     def get_file_size_formatted(self):
         """Get human readable file size"""
         size = self.file_size
-        for unit in ['B', 'KB', 'MB', 'GB']:
-            if size < 1024.0:
-                return f"{size:.1f} {unit}"
-            size /= 1024.0
-        return f"{size:.1f} TB"
+        # Each unit is 2**10 of the previous, so the bit length picks it directly
+        index = min(len(FILE_SIZE_UNITS) - 1, (max(size, 1).bit_length() - 1) // 10)
+        return f"{size / (1 << (10 * index)):.1f} {FILE_SIZE_UNITS[index]}"
 
     def is_image(self):
         """Check if attachment is an image"""
-        image_types = ['image/jpeg', 'image/png', 'image/gif', 'image/bmp', 'image/webp']
-        return self.mime_type in image_types
+        return self.mime_type in _IMAGE_MIME_TYPES
 
     def is_document(self):
         """Check if attachment is a document"""
-        doc_types = [
-            'application/pdf', 'application/msword',
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'application/vnd.ms-excel',
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'text/plain', 'text/csv'
-        ]
-        return self.mime_type in doc_types
+        return self.mime_type in _DOCUMENT_MIME_TYPES
 
+    @request_cached
     def can_user_access(self, user_id):
         """Check if user can access this attachment"""
         # Users can access attachment if they can view the task
-        from app.models.task import Task
-        task = Task.query.get(self.task_id)
+        task = self.task
         return task and task.can_user_view(user_id)
 
+    @request_cached
     def can_user_delete(self, user_id):
         """Check if user can delete this attachment"""
         # Only uploader or task creator/assignee can delete
         if user_id == self.uploaded_by:
             return True
         
-        from app.models.task import Task
-        task = Task.query.get(self.task_id)
+        task = self.task
         return task and task.can_user_edit(user_id)
 
     def to_dict(self):
@@ -84,7 +92,7 @@ class Attachment(db.Model):
             'mime_type': self.mime_type,
             'task_id': self.task_id,
             'uploaded_by': self.uploaded_by,
-            'created_at': self.created_at.isoformat(),
+            'created_at': self.created_at,
             'is_image': self.is_image(),
             'is_document': self.is_document()
         }
@@ -1,5 +1,5 @@
-from datetime import datetime
 from app import db
+from app.utils.helpers import utcnow
 
 
 class Category(db.Model):
@@ -8,19 +8,22 @@ class Category(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
-    color = db.Column(db.String(7), nullable=False, default='#007bff')  # Hex color code
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    color = db.Column(db.String(7), nullable=False, default='#007bff', server_default='#007bff')  # Hex color code
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=False)
 
     # Relationships
     task_categories = db.relationship('TaskCategory', backref='category', lazy='dynamic', cascade='all, delete-orphan')
+    tasks = db.relationship('Task', secondary='task_categories', viewonly=True)
 
     __table_args__ = (
         db.UniqueConstraint('name', 'user_id', name='unique_category_per_user'),
-        db.Index('idx_category_user', 'user_id')
+        db.Index('ix_category_user_lname', user_id, db.func.lower(name), unique=True)
     )
 
+    __mapper_args__ = {'eager_defaults': True}
+
     def __init__(self, name, color, user_id):
         self.name = name
         self.color = color
@@ -28,14 +31,13 @@ class Category(db.Model):
 
     def get_tasks(self):
         """Get all tasks assigned to this category"""
-        from app.models.task import Task
-        return db.session.query(Task).join(TaskCategory).filter(
-            TaskCategory.category_id == self.id
-        ).all()
+        return self.tasks
 
     def get_tasks_count(self):
         """Get count of tasks in this category"""
-        return self.task_categories.count()
+        return db.session.query(db.func.count()).select_from(TaskCategory).filter(
+            TaskCategory.category_id == self.id
+        ).scalar()
 
     def to_dict(self, include_task_count=False):
         """Convert category object to dictionary"""
@@ -44,8 +46,21 @@ class Category(db.Model):
             'name': self.name,
             'color': self.color,
             'user_id': self.user_id,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
+        }
+        
+        if include_task_count:
+            data['task_count'] = self.get_tasks_count()
+        
+        return data
+
+    def to_list_dict(self, include_task_count=False):
+        """Convert category to the compact form used by list endpoints"""
+        data = {
+            'id': self.id,
+            'name': self.name,
+            'color': self.color
         }
         
         if include_task_count:
@@ -61,17 +76,18 @@ class TaskCategory(db.Model):
     """Junction table for many-to-many relationship between tasks and categories"""
     __tablename__ = 'task_categories'
 
-    id = db.Column(db.Integer, primary_key=True)
-    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False, index=True)
-    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False, index=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('categories.id'), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
 
     __table_args__ = (
-        db.UniqueConstraint('task_id', 'category_id', name='unique_task_category'),
-        db.Index('idx_task_category_task', 'task_id'),
-        db.Index('idx_task_category_category', 'category_id')
+        # The natural key is the primary key; nothing references a surrogate id
+        db.PrimaryKeyConstraint('task_id', 'category_id', name='task_categories_pkey'),
+        db.Index('ix_task_categories_category_task', 'category_id', 'task_id'),
     )
 
+    __mapper_args__ = {'eager_defaults': True}
+
     def __init__(self, task_id, category_id):
         self.task_id = task_id
         self.category_id = category_id
@@ -79,10 +95,9 @@ class TaskCategory(db.Model):
     def to_dict(self):
         """Convert task-category relationship to dictionary"""
         return {
-            'id': self.id,
             'task_id': self.task_id,
             'category_id': self.category_id,
-            'created_at': self.created_at.isoformat()
+            'created_at': self.created_at
         }
 
     def __repr__(self):
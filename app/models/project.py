@@ -1,5 +1,7 @@
-from datetime import datetime
 from app import db
+from app.utils.helpers import utcnow
+from app.models.project_member import ProjectMember
+from app.models.task import Task
 
 
 class Project(db.Model):
@@ -10,21 +12,24 @@ class Project(db.Model):
     name = db.Column(db.String(200), nullable=False)
     description = db.Column(db.Text)
     status = db.Column(db.Enum('active', 'inactive', 'completed', 'archived',
-                              name='project_status'), default='active', nullable=False, index=True)
-    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+                              name='project_status'), default='active', nullable=False)
+    owner_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=False)
 
     # Relationships
     tasks = db.relationship('Task', backref='project', lazy='dynamic', cascade='all, delete-orphan')
     members = db.relationship('ProjectMember', backref='project', lazy='dynamic', cascade='all, delete-orphan')
+    member_users = db.relationship('User', secondary='project_members', viewonly=True)
 
     __table_args__ = (
-        db.Index('idx_project_owner', 'owner_id'),
         db.Index('idx_project_status', 'status'),
-        db.Index('idx_project_created', 'created_at')
+        db.Index('idx_project_created', 'created_at'),
+        db.Index('ix_project_owner_lname', owner_id, db.func.lower(name), unique=True)
     )
 
+    __mapper_args__ = {'eager_defaults': True}
+
     def __init__(self, name, description, owner_id):
         self.name = name
         self.description = description
@@ -32,23 +37,22 @@ class Project(db.Model):
 
     def get_members(self):
         """Get all project members"""
-        from app.models.user import User
-        from app.models.project_member import ProjectMember
-        return db.session.query(User).join(ProjectMember).filter(
-            ProjectMember.project_id == self.id
-        ).all()
+        return self.member_users
 
     def get_member_count(self):
         """Get count of project members"""
-        return self.members.count()
+        return db.session.query(db.func.count()).select_from(ProjectMember).filter(
+            ProjectMember.project_id == self.id
+        ).scalar()
 
     def is_member(self, user_id):
         """Check if user is a member of this project"""
-        from app.models.project_member import ProjectMember
-        return ProjectMember.query.filter_by(
-            project_id=self.id,
-            user_id=user_id
-        ).first() is not None
+        return db.session.query(
+            ProjectMember.query.filter_by(
+                project_id=self.id,
+                user_id=user_id
+            ).exists()
+        ).scalar()
 
     def can_user_access(self, user_id):
         """Check if user can access this project"""
@@ -60,19 +64,36 @@ class Project(db.Model):
 
     def get_task_count(self):
         """Get total number of tasks in project"""
-        return self.tasks.count()
+        return db.session.query(db.func.count()).filter(Task.project_id == self.id).scalar()
 
     def get_completed_task_count(self):
         """Get number of completed tasks"""
-        return self.tasks.filter_by(status='completed').count()
+        return db.session.query(db.func.count()).filter(
+            Task.project_id == self.id,
+            Task.status == 'completed'
+        ).scalar()
 
     def get_completion_percentage(self):
         """Get project completion percentage"""
-        total_tasks = self.get_task_count()
-        if total_tasks == 0:
-            return 0
-        completed_tasks = self.get_completed_task_count()
-        return (completed_tasks / total_tasks) * 100
+        return self.get_stats()['completion_percentage']
+
+    def get_stats(self):
+        """Get member, task and completed task counts in a single query"""
+        member_count = db.select(db.func.count()).select_from(ProjectMember).where(
+            ProjectMember.project_id == self.id
+        ).scalar_subquery()
+        task_count, completed_tasks, member_count = db.session.query(
+            db.func.count(),
+            db.func.count().filter(Task.status == 'completed'),
+            member_count
+        ).filter(Task.project_id == self.id).one()
+        
+        return {
+            'member_count': member_count,
+            'task_count': task_count,
+            'completed_tasks': completed_tasks,
+            'completion_percentage': (completed_tasks / task_count) * 100 if task_count else 0
+        }
 
     def to_dict(self, include_stats=False):
         """Convert project to dictionary"""
@@ -82,19 +103,24 @@ class Project(db.Model):
             'description': self.description,
             'status': self.status,
             'owner_id': self.owner_id,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
+            'created_at': self.created_at,
+            'updated_at': self.updated_at
         }
         
         if include_stats:
-            data.update({
-                'member_count': self.get_member_count(),
-                'task_count': self.get_task_count(),
-                'completed_tasks': self.get_completed_task_count(),
-                'completion_percentage': self.get_completion_percentage()
-            })
+            data.update(self.get_stats())
         
         return data
 
+    def to_list_dict(self):
+        """Convert project to the compact form used by list endpoints"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'status': self.status,
+            'owner_id': self.owner_id,
+            'created_at': self.created_at
+        }
+
     def __repr__(self):
         return f'<Project {self.name}>'
\ No newline at end of file
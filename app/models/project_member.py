@@ -1,24 +1,25 @@
-from datetime import datetime
 from app import db
+from app.utils.helpers import utcnow
 
 
 class ProjectMember(db.Model):
     """Junction table for project members"""
     __tablename__ = 'project_members'
 
-    id = db.Column(db.Integer, primary_key=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False, index=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    role = db.Column(db.String(50), default='member', nullable=False)  # member, admin, etc.
-    joined_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    role = db.Column(db.String(50), default='member', server_default='member', nullable=False)  # member, admin, etc.
+    joined_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
 
     __table_args__ = (
-        db.UniqueConstraint('project_id', 'user_id', name='unique_project_member'),
-        db.Index('idx_project_member_project', 'project_id'),
-        db.Index('idx_project_member_user', 'user_id')
+        # The natural key is the primary key; nothing references a surrogate id
+        db.PrimaryKeyConstraint('project_id', 'user_id', name='project_members_pkey'),
+        db.Index('ix_project_members_user_project', 'user_id', 'project_id'),
     )
 
+    __mapper_args__ = {'eager_defaults': True}
+
     def __init__(self, project_id, user_id, role='member'):
         self.project_id = project_id
         self.user_id = user_id
@@ -27,12 +28,11 @@ class ProjectMember(db.Model):
     def to_dict(self):
         """Convert project member to dictionary"""
         return {
-            'id': self.id,
             'project_id': self.project_id,
             'user_id': self.user_id,
             'role': self.role,
-            'joined_at': self.joined_at.isoformat(),
-            'created_at': self.created_at.isoformat()
+            'joined_at': self.joined_at,
+            'created_at': self.created_at
         }
 
     def __repr__(self):
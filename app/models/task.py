@@ -1,5 +1,16 @@
 from datetime import datetime
+from flask import current_app
+from sqlalchemy.orm import raiseload, selectinload, validates
 from app import db
+from app.models.attachment import Attachment
+from app.models.category import TaskCategory
+from app.models.task_comment import TaskComment
+from app.models.user import User
+from app.utils.helpers import request_cached
+
+
+# Sort rank for each priority, kept in Task.priority_rank so ordering by priority can use an index
+PRIORITY_RANKS = {'low': 1, 'medium': 2, 'high': 3, 'critical': 4}
 
 
 class Task(db.Model):
@@ -12,9 +23,10 @@ class Task(db.Model):
                               name='task_status'), default='pending', nullable=False, index=True)
     priority = db.Column(db.Enum('low', 'medium', 'high', 'critical', 
                                 name='task_priority'), default='medium', nullable=False, index=True)
-    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False, index=True)
-    assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True, index=True)
-    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
+    priority_rank = db.Column(db.SmallInteger, default=PRIORITY_RANKS['medium'], nullable=False)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
+    assigned_to = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     due_date = db.Column(db.DateTime, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
@@ -23,6 +35,15 @@ class Task(db.Model):
     comments = db.relationship('TaskComment', backref='task', lazy='dynamic', cascade='all, delete-orphan')
     attachments = db.relationship('Attachment', backref='task', lazy='dynamic', cascade='all, delete-orphan')
     task_categories = db.relationship('TaskCategory', backref='task', lazy='dynamic', cascade='all, delete-orphan')
+    categories = db.relationship('Category', secondary='task_categories', viewonly=True)
+
+    __table_args__ = (
+        db.Index('ix_task_cat_order', db.text('priority_rank DESC'), db.text('created_at DESC')),
+        db.Index('ix_tasks_assigned_status_due', 'assigned_to', 'status', 'due_date'),
+        db.Index('ix_tasks_project_created', 'project_id', 'created_at'),
+        db.Index('ix_tasks_project_status', 'project_id', 'status'),
+        db.Index('ix_tasks_created_by_created', 'created_by', 'created_at'),
+    )
 
     def __init__(self, title, description, project_id, created_by, 
                  assigned_to=None, priority='medium', due_date=None):
@@ -34,6 +55,12 @@ class Task(db.Model):
         self.priority = priority
         self.due_date = due_date
 
+    @validates('priority')
+    def _sync_priority_rank(self, key, priority):
+        """Keep priority_rank in step with priority on every assignment."""
+        self.priority_rank = PRIORITY_RANKS.get(priority, PRIORITY_RANKS['medium'])
+        return priority
+
     def update_status(self, new_status):
         """Update task status with validation."""
         valid_statuses = ['pending', 'in_progress', 'completed', 'cancelled']
@@ -61,28 +88,69 @@ class Task(db.Model):
 
     def get_comments_count(self):
         """Get number of comments on the task."""
-        return self.comments.count()
+        counts = self.__dict__.get('_preloaded_counts')
+        if counts is not None:
+            return counts[0]
+        return db.session.query(db.func.count(TaskComment.id)).filter(
+            TaskComment.task_id == self.id
+        ).scalar()
 
     def get_attachments_count(self):
         """Get number of attachments on the task."""
-        return self.attachments.count()
+        counts = self.__dict__.get('_preloaded_counts')
+        if counts is not None:
+            return counts[1]
+        return db.session.query(db.func.count(Attachment.id)).filter(
+            Attachment.task_id == self.id
+        ).scalar()
 
     def get_categories(self):
         """Get all categories assigned to this task."""
-        from app.models.category import Category
-        return db.session.query(Category).join(TaskCategory).filter(
-            TaskCategory.task_id == self.id
-        ).all()
+        return self.categories
+
+    @staticmethod
+    def list_loader_options(include_categories=False):
+        """Loader options for queries whose rows are serialized with to_dict."""
+        options = [selectinload(Task.categories)] if include_categories else []
+        if current_app.debug:
+            # Surface any relationship to_dict starts touching instead of lazy loading it per row
+            options.append(raiseload('*'))
+        return options
+
+    @staticmethod
+    def preload_counts(tasks):
+        """Fetch comment and attachment counts for a page of tasks in two grouped queries."""
+        task_ids = [task.id for task in tasks]
+        if not task_ids:
+            return tasks
+
+        comment_counts = dict(
+            db.session.query(TaskComment.task_id, db.func.count(TaskComment.id))
+            .filter(TaskComment.task_id.in_(task_ids))
+            .group_by(TaskComment.task_id)
+        )
+        attachment_counts = dict(
+            db.session.query(Attachment.task_id, db.func.count(Attachment.id))
+            .filter(Attachment.task_id.in_(task_ids))
+            .group_by(Attachment.task_id)
+        )
+
+        for task in tasks:
+            task._preloaded_counts = (
+                comment_counts.get(task.id, 0),
+                attachment_counts.get(task.id, 0)
+            )
+        return tasks
 
     def add_category(self, category_id):
         """Add a category to the task."""
-        from app.models.category import TaskCategory
-        
         # Check if category is already assigned
-        existing = TaskCategory.query.filter_by(
-            task_id=self.id,
-            category_id=category_id
-        ).first()
+        existing = db.session.query(
+            TaskCategory.query.filter_by(
+                task_id=self.id,
+                category_id=category_id
+            ).exists()
+        ).scalar()
         
         if existing:
             return False
@@ -94,18 +162,15 @@ class Task(db.Model):
 
     def remove_category(self, category_id):
         """Remove a category from the task."""
-        from app.models.category import TaskCategory
-        
-        task_category = TaskCategory.query.filter_by(
+        removed = TaskCategory.query.filter_by(
             task_id=self.id,
             category_id=category_id
-        ).first()
-        
-        if task_category:
-            db.session.delete(task_category)
-            return True
-        return False
+        ).delete(synchronize_session=False)
+        if removed:
+            db.session.expire(self, ['categories'])
+        return removed > 0
 
+    @request_cached
     def can_user_edit(self, user_id):
         """Check if user can edit this task."""
         # Task creator, assignee, or project owner can edit
@@ -113,15 +178,23 @@ class Task(db.Model):
             return True
         
         # Check if user is project owner
-        from app.models.project import Project
-        project = Project.query.get(self.project_id)
+        project = self.project
         return project and project.owner_id == user_id
 
+    @staticmethod
+    def editable_by(user_id):
+        """SQL form of can_user_edit, for filtering rows inside a single statement."""
+        return db.or_(
+            Task.created_by == user_id,
+            Task.assigned_to == user_id,
+            Task.project.has(owner_id=user_id)
+        )
+
+    @request_cached
     def can_user_view(self, user_id):
         """Check if user can view this task."""
         # Check if user has access to the project
-        from app.models.user import User
-        user = User.query.get(user_id)
+        user = db.session.get(User, user_id)
         return user and user.can_access_project(self.project_id)
 
     def to_dict(self, include_comments=False, include_attachments=False, include_categories=False):
@@ -144,7 +217,9 @@ class Task(db.Model):
         }
         
         if include_comments:
-            data['comments'] = [comment.to_dict() for comment in self.comments.all()]
+            data['comments'] = TaskComment.bulk_to_dict(
+                self.comments.order_by(TaskComment.created_at).all()
+            )
         
         if include_attachments:
             data['attachments'] = [attachment.to_dict() for attachment in self.attachments.all()]
@@ -154,6 +229,39 @@ class Task(db.Model):
         
         return data
 
+    def to_dict_fast(self, include_categories=False, now=None):
+        """List-endpoint form of to_dict without comments or attachments.
+
+        Datetimes are left as objects for orjson to encode natively, which gives
+        the same ISO strings as to_dict. Pass ``now`` to share one clock read
+        across a page.
+        """
+        due_date = self.due_date
+        status = self.status
+        if now is None:
+            now = datetime.utcnow()
+        data = {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'status': status,
+            'priority': self.priority,
+            'project_id': self.project_id,
+            'assigned_to': self.assigned_to,
+            'created_by': self.created_by,
+            'due_date': due_date,
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
+            'is_overdue': due_date is not None and now > due_date and status not in ('completed', 'cancelled'),
+            'comments_count': self.get_comments_count(),
+            'attachments_count': self.get_attachments_count()
+        }
+        
+        if include_categories:
+            data['categories'] = [category.to_dict() for category in self.categories]
+        
+        return data
+
     @staticmethod
     def get_tasks_by_filters(project_id=None, assigned_to=None, status=None, 
                            priority=None, limit=None, offset=None):
@@ -170,13 +278,7 @@ class Task(db.Model):
             query = query.filter_by(priority=priority)
         
         # Order by priority (critical first) and creation date
-        priority_order = db.case(
-            (Task.priority == 'critical', 0),
-            (Task.priority == 'high', 1),
-            (Task.priority == 'medium', 2),
-            (Task.priority == 'low', 3)
-        )
-        query = query.order_by(priority_order, Task.created_at.desc())
+        query = query.order_by(Task.priority_rank.desc(), Task.created_at.desc())
         
         if offset:
             query = query.offset(offset)
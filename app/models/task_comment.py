@@ -1,5 +1,6 @@
-from datetime import datetime
 from app import db
+from app.utils.helpers import utcnow
+from app.models.user import User
 
 
 class TaskComment(db.Model):
@@ -8,18 +9,20 @@ class TaskComment(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     content = db.Column(db.Text, nullable=False)
-    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False, index=True)
-    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False, index=True)
-    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
-    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
-    is_edited = db.Column(db.Boolean, default=False, nullable=False)
+    task_id = db.Column(db.Integer, db.ForeignKey('tasks.id'), nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=utcnow(), nullable=False)
+    updated_at = db.Column(db.DateTime, server_default=utcnow(), onupdate=utcnow(), nullable=False)
+    is_edited = db.Column(db.Boolean, default=False, server_default=db.false(), nullable=False)
 
     __table_args__ = (
-        db.Index('idx_comment_task', 'task_id'),
+        db.Index('idx_comment_task_created', 'task_id', 'created_at'),
         db.Index('idx_comment_author', 'author_id'),
         db.Index('idx_comment_created', 'created_at')
     )
 
+    __mapper_args__ = {'eager_defaults': True}
+
     def __init__(self, content, task_id, author_id):
         self.content = content
         self.task_id = task_id
@@ -30,7 +33,6 @@ class TaskComment(db.Model):
         if new_content != self.content:
             self.content = new_content
             self.is_edited = True
-            self.updated_at = datetime.utcnow()
 
     def can_user_edit(self, user_id):
         """Check if user can edit this comment"""
@@ -42,8 +44,7 @@ class TaskComment(db.Model):
         if user_id == self.author_id:
             return True
         
-        from app.models.task import Task
-        task = Task.query.get(self.task_id)
+        task = self.task
         return task and task.can_user_edit(user_id)
 
     def to_dict(self, include_author=True):
@@ -53,22 +54,41 @@ class TaskComment(db.Model):
             'content': self.content,
             'task_id': self.task_id,
             'author_id': self.author_id,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
+            'created_at': self.created_at,
+            'updated_at': self.updated_at,
             'is_edited': self.is_edited
         }
         
         if include_author:
-            from app.models.user import User
-            author = User.query.get(self.author_id)
-            if author:
-                data['author'] = {
-                    'id': author.id,
-                    'username': author.username,
-                    'full_name': author.full_name
-                }
+            # Uses the ``author`` backref, so list queries can selectin-load it
+            self._add_author(data, self.author)
         
         return data
 
+    @classmethod
+    def bulk_to_dict(cls, comments):
+        """Serialize a list of comments, fetching all their authors in one query"""
+        author_ids = {comment.author_id for comment in comments}
+        authors = {
+            user.id: user for user in User.query.filter(User.id.in_(author_ids))
+        } if author_ids else {}
+        
+        result = []
+        for comment in comments:
+            data = comment.to_dict(include_author=False)
+            cls._add_author(data, authors.get(comment.author_id))
+            result.append(data)
+        return result
+
+    @staticmethod
+    def _add_author(data, author):
+        """Attach the public author fields to a serialized comment"""
+        if author:
+            data['author'] = {
+                'id': author.id,
+                'username': author.username,
+                'full_name': author.full_name
+            }
+
     def __repr__(self):
         return f'<TaskComment id={self.id} task_id={self.task_id}>'
\ No newline at end of file
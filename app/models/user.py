@@ -1,7 +1,10 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
-from werkzeug.security import generate_password_hash, check_password_hash
 from app import db
+from app.utils.security import hash_password, verify_password, password_needs_rehash
+from app.utils.helpers import request_cached
+from app.utils.cache import get_cached_project_access, cache_project_access
+from app.models.project_member import ProjectMember
 
 
 class User(db.Model):
@@ -17,7 +20,7 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
-    is_verified = db.Column(db.Boolean, default=False, nullable=False)
+    is_verified = db.Column(db.Boolean, default=False, server_default=db.false(), nullable=False)
 
     # Relationships
     created_projects = db.relationship('Project', foreign_keys='Project.owner_id', backref='owner', lazy='dynamic')
@@ -38,17 +41,18 @@ class User(db.Model):
 
     def set_password(self, password):
         """Set password hash from plain text password."""
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
 
     def check_password(self, password):
         """Check if provided password matches hash."""
-        return check_password_hash(self.password_hash, password)
+        return verify_password(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """Check if the stored hash predates the current hashing parameters."""
+        return password_needs_rehash(self.password_hash)
 
     def get_projects(self):
         """Get all projects user has access to."""
-        from app.models.project_member import ProjectMember
-        from app.models.project import Project
-        
         # Projects owned by user
         owned_projects = Project.query.filter_by(owner_id=self.id).all()
         
@@ -62,26 +66,27 @@ class User(db.Model):
         all_projects = list(set(owned_projects + member_projects))
         return all_projects
 
+    @request_cached
     def can_access_project(self, project_id):
         """Check if user can access a specific project."""
-        from app.models.project_member import ProjectMember
-        from app.models.project import Project
-        
-        project = Project.query.get(project_id)
-        if not project:
+        try:
+            project_id = int(project_id)
+        except (TypeError, ValueError):
             return False
         
-        # Check if user is owner
-        if project.owner_id == self.id:
-            return True
-        
-        # Check if user is a member
-        membership = ProjectMember.query.filter_by(
-            project_id=project_id,
-            user_id=self.id
-        ).first()
+        cached = get_cached_project_access(self.id, project_id)
+        if cached is not None:
+            return cached
         
-        return membership is not None
+        project_ids = self.get_accessible_project_ids()
+        cache_project_access(self.id, project_ids)
+        return project_id in project_ids
+
+    def get_accessible_project_ids(self):
+        """Get ids of projects the user owns or is a member of."""
+        owned = db.session.query(Project.id).filter(Project.owner_id == self.id)
+        member = db.session.query(ProjectMember.project_id).filter(ProjectMember.user_id == self.id)
+        return {project_id for project_id, in owned.union(member)}
 
     def to_dict(self):
         """Convert user object to dictionary."""
@@ -99,4 +104,8 @@ class User(db.Model):
         }
 
     def __repr__(self):
-        return f'<User {self.username}>'
\ No newline at end of file
+        return f'<User {self.username}>'
+
+
+# Imported after User is defined: project -> task -> user closes a cycle
+from app.models.project import Project  # noqa: E402
@@ -2,4 +2,4 @@
 Utility functions and helpers for the Task Manager Application
 """
 
-__all__ = ['validators', 'decorators', 'helpers']
\ No newline at end of file
+__all__ = ['validators', 'decorators', 'helpers', 'security', 'json_provider', 'schemas', 'cache', 'query_counter']
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+Short-lived Redis cache for read-heavy JSON endpoints
+
+Each user gets one Redis hash per namespace, holding one serialized
+response body per path and query string, so a single DEL invalidates
+every cached page and filter combination for that user.
+"""
+from functools import wraps
+import redis
+from flask import request, current_app
+from flask_jwt_extended import get_jwt_identity
+
+from app import redis_client
+
+CACHE_PREFIX = 'cache:'
+
+
+def _cache_key(namespace, user_id):
+    return f'{CACHE_PREFIX}{namespace}:{user_id}'
+
+
+def _store(key, field, body, timeout):
+    pipe = redis_client.pipeline()
+    pipe.hset(key, field, body)
+    pipe.ttl(key)
+    _, ttl = pipe.execute()
+    # Only a freshly created hash gets a TTL, so entries never outlive it
+    if ttl < 0:
+        redis_client.expire(key, timeout)
+
+
+def cached_response(namespace, timeout=60):
+    """Decorator caching a view's successful response body per user, path and query string"""
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            key = _cache_key(namespace, get_jwt_identity())
+            # The path is part of the field so routes with URL arguments never share entries
+            field = request.full_path
+            
+            try:
+                body = redis_client.hget(key, field)
+            except redis.RedisError as e:
+                current_app.logger.warning('Response cache read failed: %s', e)
+                body = None
+            
+            if body is not None:
+                return current_app.response_class(body, mimetype='application/json')
+            
+            response = f(*args, **kwargs)
+            
+            if isinstance(response, current_app.response_class) and response.status_code == 200:
+                try:
+                    _store(key, field, response.get_data(), timeout)
+                except redis.RedisError as e:
+                    current_app.logger.warning('Response cache write failed: %s', e)
+            
+            return response
+        return decorated_function
+    return decorator
+
+
+def invalidate_cache(namespace, *user_ids):
+    """Drop every cached response in a namespace for the given users
+    
+    ``namespace`` may also be a tuple of namespaces, cleared in one DEL.
+    """
+    namespaces = namespace if isinstance(namespace, tuple) else (namespace,)
+    keys = {
+        _cache_key(ns, user_id)
+        for ns in namespaces
+        for user_id in user_ids if user_id is not None
+    }
+    if not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError as e:
+        current_app.logger.warning('Response cache invalidation failed: %s', e)
+
+
+# Project ids each user can access, as a Redis set per user. Members are
+# stored as strings; 0 marks a user with no projects so the key still exists.
+ACCESS_PREFIX = 'access:'
+ACCESS_TTL = 300
+
+
+def _access_key(user_id):
+    return f'{ACCESS_PREFIX}{user_id}'
+
+
+def get_cached_project_access(user_id, project_id):
+    """Look up project access in the cached set; None when not cached"""
+    try:
+        pipe = redis_client.pipeline()
+        pipe.exists(_access_key(user_id))
+        pipe.sismember(_access_key(user_id), project_id)
+        exists, is_member = pipe.execute()
+    except redis.RedisError as e:
+        current_app.logger.warning('Project access cache read failed: %s', e)
+        return None
+    
+    if not exists:
+        return None
+    return bool(is_member)
+
+
+def cache_project_access(user_id, project_ids):
+    """Store the full set of project ids a user can access"""
+    key = _access_key(user_id)
+    try:
+        pipe = redis_client.pipeline()
+        pipe.delete(key)
+        pipe.sadd(key, 0, *project_ids)
+        pipe.expire(key, ACCESS_TTL)
+        pipe.execute()
+    except redis.RedisError as e:
+        current_app.logger.warning('Project access cache write failed: %s', e)
+
+
+def invalidate_project_access(*user_ids):
+    """Forget cached project access so it is rebuilt on the next check"""
+    keys = [_access_key(user_id) for user_id in user_ids if user_id is not None]
+    if not keys:
+        return
+    try:
+        redis_client.delete(*keys)
+    except redis.RedisError as e:
+        current_app.logger.warning('Project access cache invalidation failed: %s', e)
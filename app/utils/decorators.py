@@ -1,6 +1,7 @@
 from functools import wraps
-from flask import jsonify, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask import jsonify, current_app, g
+from flask_jwt_extended import get_jwt, get_jwt_identity, verify_jwt_in_request
+from app import db
 from app.models.user import User
 
 
@@ -39,13 +40,34 @@ def require_json(f):
     return decorated_function
 
 
+def _verify_jwt_once():
+    """Verify the request JWT unless an outer @jwt_required() already did.
+
+    Routes stack @jwt_required() on top of the user decorators, so verifying
+    again here would decode the token and check the blocklist a second time.
+    """
+    try:
+        get_jwt()
+    except RuntimeError:
+        verify_jwt_in_request()
+
+
+def _load_current_user():
+    """Load the JWT identity's user once per request and keep it on ``g``"""
+    _verify_jwt_once()
+    current_user_id = get_jwt_identity()
+    user = g.get('current_user')
+    if user is None or user.id != current_user_id:
+        user = g.current_user = db.session.get(User, current_user_id)
+    return user
+
+
 def require_active_user(f):
     """Decorator to ensure current user is active"""
     @wraps(f)
-    @jwt_required()
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        # The loaded user is shared with the view through g.current_user
+        user = _load_current_user()
         
         if not user or not user.is_active:
             return jsonify({
@@ -60,10 +82,8 @@ def require_active_user(f):
 def require_verified_user(f):
     """Decorator to ensure current user is verified"""
     @wraps(f)
-    @jwt_required()
     def decorated_function(*args, **kwargs):
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
+        user = _load_current_user()
         
         if not user:
             return jsonify({
@@ -89,6 +109,16 @@ def require_verified_user(f):
 
 def validate_json_fields(required_fields=None, optional_fields=None):
     """Decorator to validate JSON fields in request"""
+    # The field lists are fixed per decoration site, so build the lookup
+    # structures and error messages once instead of on every request
+    required = tuple(
+        (field, f'{field.replace("_", " ").title()} is required')
+        for field in required_fields or ()
+    )
+    allowed_fields = None
+    if optional_fields is not None:
+        allowed_fields = frozenset(required_fields or ()) | frozenset(optional_fields)
+
     def decorator(f):
         @wraps(f)
         def decorated_function(*args, **kwargs):
@@ -103,22 +133,20 @@ def validate_json_fields(required_fields=None, optional_fields=None):
             data = request.get_json()
             
             # Check required fields
-            if required_fields:
-                for field in required_fields:
-                    if field not in data or data[field] is None:
-                        return jsonify({
-                            'success': False,
-                            'message': f'{field.replace("_", " ").title()} is required'
-                        }), 400
+            for field, message in required:
+                if data.get(field) is None:
+                    return jsonify({
+                        'success': False,
+                        'message': message
+                    }), 400
             
             # Check for unexpected fields
-            if optional_fields is not None:
-                allowed_fields = set(required_fields or []) | set(optional_fields or [])
-                unexpected_fields = set(data.keys()) - allowed_fields
+            if allowed_fields is not None:
+                unexpected_fields = data.keys() - allowed_fields
                 if unexpected_fields:
                     return jsonify({
                         'success': False,
-                        'message': f'Unexpected fields: {', '.join(unexpected_fields)}'
+                        'message': 'Unexpected fields: ' + ', '.join(sorted(unexpected_fields))
                     }), 400
             
             return f(*args, **kwargs)
@@ -132,18 +160,20 @@ def paginate_query(f):
     def decorated_function(*args, **kwargs):
         from flask import request
         
-        # Get pagination parameters
-        page = request.args.get('page', 1, type=int)
-        per_page = min(request.args.get('per_page', 20, type=int), 100)  # Max 100 items per page
-        
-        if page < 1:
+        # Get pagination parameters, falling back to the defaults on bad input
+        query_args = request.args
+        try:
+            page = int(query_args.get('page', 1))
+        except ValueError:
             page = 1
-        if per_page < 1:
+        try:
+            per_page = int(query_args.get('per_page', 20))
+        except ValueError:
             per_page = 20
         
         # Add pagination info to kwargs
-        kwargs['page'] = page
-        kwargs['per_page'] = per_page
+        kwargs['page'] = page if page > 0 else 1
+        kwargs['per_page'] = min(per_page, 100) if per_page > 0 else 20  # Max 100 items per page
         
         return f(*args, **kwargs)
     return decorated_function
\ No newline at end of file
@@ -1,9 +1,121 @@
 import os
+import re
+import base64
+import binascii
 import secrets
+import time
 import uuid
 from datetime import datetime
-from werkzeug.utils import secure_filename
-from flask import current_app
+from functools import wraps
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import FunctionElement
+from flask import current_app, g, has_request_context
+
+from app.utils.json_provider import orjson_dumps
+
+# Anything outside this set is collapsed to '_' when sanitizing filenames
+_FILENAME_STRIP = re.compile(r'[^A-Za-z0-9._-]+')
+_DEFAULT_ALLOWED_EXTENSIONS = frozenset({
+    'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'xls', 'xlsx'
+})
+FILE_SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB')
+# Single characters stripped from search input in one str.translate pass.
+# 'xp_'/'sp_' need no entry of their own since '_' is already removed here.
+_SEARCH_STRIP_CHARS = str.maketrans('', '', '%_;')
+# Star runs for mask_email, covering any realistic local-part length
+_MASK_STARS = tuple('*' * n for n in range(64))
+
+
+
+class utcnow(FunctionElement):
+    """Current UTC time as a naive timestamp, evaluated by the database.
+
+    Used as a column server default so inserts don't build a datetime per row.
+    Models using it set ``eager_defaults`` so the value comes back through
+    RETURNING rather than a refresh SELECT.
+    """
+    type = DateTime()
+    inherit_cache = True
+
+
+@compiles(utcnow)
+def _compile_utcnow(element, compiler, **kw):
+    # SQLite's CURRENT_TIMESTAMP is already UTC
+    return 'CURRENT_TIMESTAMP'
+
+
+@compiles(utcnow, 'postgresql')
+def _compile_utcnow_postgresql(element, compiler, **kw):
+    # now() is timestamptz; convert so naive columns keep storing UTC
+    return "TIMEZONE('utc', CURRENT_TIMESTAMP)"
+
+
+# Seconds a formatted event timestamp is reused for
+TIMESTAMP_REUSE_SECONDS = 0.05
+_last_timestamp = [float('-inf'), '']
+
+
+def utc_now_iso():
+    """Current UTC time as an ISO string, reformatted at most every 50ms.
+
+    Socket events stamp every payload; isoformat() is already C, so reusing
+    the last string is the only thing that makes this cheaper.
+    """
+    now = time.monotonic()
+    if now - _last_timestamp[0] > TIMESTAMP_REUSE_SECONDS:
+        _last_timestamp[:] = [now, datetime.utcnow().isoformat()]
+    return _last_timestamp[1]
+
+def eventlet_patched():
+    """Check if we are running under a monkey-patched eventlet worker"""
+    try:
+        from eventlet import patcher
+    except ImportError:
+        return False
+    return patcher.is_monkey_patched('thread')
+
+
+def run_blocking(func, *args, **kwargs):
+    """Run blocking disk or CPU work without stalling the eventlet hub
+    
+    Eventlet only makes sockets cooperative; file writes and hashing still
+    block every greenlet in the worker. Under eventlet the call is handed to
+    a native thread pool, otherwise it runs inline.
+    """
+    if eventlet_patched():
+        from eventlet import tpool
+        return tpool.execute(func, *args, **kwargs)
+    return func(*args, **kwargs)
+
+
+def nonblocking_file(file_obj):
+    """Wrap a file so its method calls go through run_blocking"""
+    if eventlet_patched():
+        from eventlet import tpool
+        return tpool.Proxy(file_obj)
+    return file_obj
+
+
+def request_cached(func):
+    """Memoize a model method for the rest of the current request
+    
+    Results are keyed on the method, the instance's primary key and the
+    arguments, and stored on ``flask.g`` so permission checks repeated within
+    one request hit the database only once. Outside a request the method
+    runs uncached.
+    """
+    @wraps(func)
+    def wrapper(self, *args):
+        if not has_request_context():
+            return func(self, *args)
+        
+        cache = g.setdefault('_acl_cache', {})
+        key = (func.__qualname__, self.id, args)
+        if key not in cache:
+            cache[key] = func(self, *args)
+        return cache[key]
+    return wrapper
 
 
 def generate_unique_filename(original_filename):
@@ -11,11 +123,8 @@ def generate_unique_filename(original_filename):
     if not original_filename:
         return str(uuid.uuid4())
     
-    # Secure the filename
-    filename = secure_filename(original_filename)
-    
     # Get file extension
-    name, ext = os.path.splitext(filename)
+    name, ext = os.path.splitext(sanitize_filename(original_filename))
     
     # Generate unique filename
     unique_id = str(uuid.uuid4())
@@ -24,15 +133,31 @@ def generate_unique_filename(original_filename):
     return f"{timestamp}_{unique_id}{ext}"
 
 
+def sanitize_filename(filename):
+    """Reduce a filename to a safe ASCII name without path separators"""
+    return _FILENAME_STRIP.sub('_', filename).strip('._')
+
+
+def sanitize_and_check(filename, allowed_extensions=None):
+    """Sanitize a filename and check its extension in a single pass
+    
+    Returns an ``(allowed, clean_filename)`` tuple.
+    """
+    if allowed_extensions is None:
+        allowed_extensions = current_app.config.get('ALLOWED_EXTENSIONS', _DEFAULT_ALLOWED_EXTENSIONS)
+    
+    clean = sanitize_filename(filename)
+    _, dot, ext = clean.rpartition('.')
+    return bool(dot) and ext.lower() in allowed_extensions, clean
+
+
 def allowed_file(filename, allowed_extensions=None):
     """Check if file extension is allowed"""
     if allowed_extensions is None:
-        allowed_extensions = current_app.config.get('ALLOWED_EXTENSIONS', {
-            'txt', 'pdf', 'png', 'jpg', 'jpeg', 'gif', 'doc', 'docx', 'xls', 'xlsx'
-        })
+        allowed_extensions = current_app.config.get('ALLOWED_EXTENSIONS', _DEFAULT_ALLOWED_EXTENSIONS)
     
-    return '.' in filename and \
-           filename.rsplit('.', 1)[1].lower() in allowed_extensions
+    _, dot, ext = filename.rpartition('.')
+    return bool(dot) and ext.lower() in allowed_extensions
 
 
 def get_file_size_formatted(size_bytes):
@@ -40,15 +165,9 @@ def get_file_size_formatted(size_bytes):
     if size_bytes == 0:
         return '0 B'
     
-    size_names = ['B', 'KB', 'MB', 'GB', 'TB']
-    i = 0
-    size = float(size_bytes)
-    
-    while size >= 1024.0 and i < len(size_names) - 1:
-        size /= 1024.0
-        i += 1
-    
-    return f"{size:.1f} {size_names[i]}"
+    # Each unit is 2**10 of the previous, so the bit length picks it directly
+    i = min(len(FILE_SIZE_UNITS) - 1, (int(size_bytes).bit_length() - 1) // 10)
+    return f"{size_bytes / (1 << (10 * i)):.1f} {FILE_SIZE_UNITS[i]}"
 
 
 def create_api_response(success=True, message='', data=None, status_code=200):
@@ -61,7 +180,65 @@ def create_api_response(success=True, message='', data=None, status_code=200):
     if data is not None:
         response['data'] = data
     
-    return response, status_code
+    return current_app.response_class(
+        orjson_dumps(response),
+        status=status_code,
+        mimetype='application/json'
+    )
+
+
+def encode_cursor(order_value, row_id):
+    """Encode the last row's sort key into an opaque pagination cursor"""
+    if isinstance(order_value, datetime):
+        order_value = order_value.isoformat()
+    raw = f'{order_value}|{row_id}'
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor, value_type=datetime):
+    """Decode a pagination cursor into (order value, id)"""
+    try:
+        order_value, row_id = base64.urlsafe_b64decode(cursor.encode()).decode().rsplit('|', 1)
+        if value_type is datetime:
+            order_value = datetime.fromisoformat(order_value)
+        else:
+            order_value = value_type(order_value)
+        return order_value, int(row_id)
+    except (ValueError, UnicodeDecodeError, binascii.Error):
+        raise ValueError('Invalid pagination cursor')
+
+
+def keyset_page_query(query, order_column, id_column, cursor, per_page, descending=True):
+    """Restrict a query to the page after ``cursor``, plus one row to detect a next page"""
+    if cursor:
+        last_value, last_id = decode_cursor(cursor, order_column.type.python_type)
+        key = tuple_(order_column, id_column)
+        query = query.filter(key < (last_value, last_id) if descending else key > (last_value, last_id))
+    
+    if descending:
+        ordering = (order_column.desc(), id_column.desc())
+    else:
+        ordering = (order_column.asc(), id_column.asc())
+    
+    return query.order_by(None).order_by(*ordering).limit(per_page + 1)
+
+
+def paginate_keyset(query, order_column, id_column, cursor, per_page, descending=True):
+    """Seek-paginate a query, returning (items, next_cursor)
+    
+    Rows are ordered by (order_column, id_column), newest/largest first
+    unless ``descending`` is False, and the next page starts strictly after
+    the cursor, so the database walks the index instead of skipping OFFSET
+    rows and no COUNT(*) is issued.
+    """
+    rows = keyset_page_query(query, order_column, id_column, cursor, per_page, descending).all()
+    
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(getattr(rows[-1], order_column.key), getattr(rows[-1], id_column.key))
+    
+    return rows, next_cursor
 
 
 def parse_date_range(start_date_str, end_date_str):
@@ -111,15 +288,19 @@ def generate_api_key():
 
 def mask_email(email):
     """Mask email address for privacy"""
-    if not email or '@' not in email:
+    if not email:
         return email
     
-    username, domain = email.split('@', 1)
+    username, at, domain = email.partition('@')
+    if not at or not username:
+        return email
     
-    if len(username) <= 2:
+    hidden = len(username) - 2
+    if hidden <= 0:
         masked_username = username[0] + '*'
     else:
-        masked_username = username[0] + '*' * (len(username) - 2) + username[-1]
+        stars = _MASK_STARS[hidden] if hidden < len(_MASK_STARS) else '*' * hidden
+        masked_username = username[0] + stars + username[-1]
     
     return f"{masked_username}@{domain}"
 
@@ -150,12 +331,9 @@ def sanitize_search_query(query):
         return ''
     
     # Remove potentially dangerous characters
-    dangerous_chars = ['%', '_', ';', '--', '/*', '*/', 'xp_', 'sp_']
-    
-    sanitized = str(query).strip()
-    
-    for char in dangerous_chars:
-        sanitized = sanitized.replace(char, '')
+    sanitized = str(query).strip().translate(_SEARCH_STRIP_CHARS)
+    # Order matters: dropping '--' can expose a new '*/'
+    sanitized = sanitized.replace('--', '').replace('/*', '').replace('*/', '')
     
     return sanitized[:100]  # Limit length
 
@@ -0,0 +1,46 @@
+"""
+orjson-backed JSON provider for Flask's ``jsonify`` and request parsing
+"""
+import orjson
+from flask.json.provider import DefaultJSONProvider
+
+# Options and fallback shared by every serializer of API data (jsonify,
+# create_api_response, streamed task lists, Socket.IO packets) so a value
+# renders the same on every path. Naive datetimes keep their isoformat()
+# text, and types orjson cannot handle go through Flask's default hook.
+ORJSON_OPTION = orjson.OPT_NON_STR_KEYS
+orjson_default = DefaultJSONProvider.default
+
+
+def orjson_dumps(obj):
+    """Serialize API data to bytes with the shared orjson settings"""
+    return orjson.dumps(obj, default=orjson_default, option=ORJSON_OPTION)
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes with the shared orjson settings"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson_dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson_dumps(obj),
+            mimetype=self.mimetype
+        )
+
+
+class OrjsonSocketIOJSON:
+    """orjson-backed ``json`` module for python-socketio packet encoding"""
+
+    @staticmethod
+    def dumps(obj, **kwargs):
+        return orjson_dumps(obj).decode()
+
+    @staticmethod
+    def loads(s, **kwargs):
+        return orjson.loads(s)
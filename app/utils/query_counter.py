@@ -0,0 +1,35 @@
+"""
+Per-request SQL query counter for catching N+1 regressions
+
+When ``QUERY_COUNT_WARN_THRESHOLD`` is set, every statement executed while
+handling a request is counted. The total is sent back in an
+``X-Query-Count`` header, and requests over the threshold are logged.
+"""
+from flask import g, has_app_context, request
+from sqlalchemy import event
+
+
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    if has_app_context():
+        g._query_count = g.get('_query_count', 0) + 1
+
+
+def init_query_counter(app, db):
+    """Attach the counter to the app's engine if a threshold is configured"""
+    threshold = app.config.get('QUERY_COUNT_WARN_THRESHOLD')
+    if not threshold:
+        return
+    
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', _count_query)
+    
+    @app.after_request
+    def report_query_count(response):
+        count = g.get('_query_count', 0)
+        response.headers['X-Query-Count'] = str(count)
+        if count > threshold:
+            app.logger.warning(
+                '%s %s ran %d queries (threshold %d)',
+                request.method, request.path, count, threshold
+            )
+        return response
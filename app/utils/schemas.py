@@ -0,0 +1,51 @@
+"""
+Request body schemas, decoded and validated in one pass with msgspec
+"""
+from typing import Annotated
+import msgspec
+from flask import request
+
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
+
+
+class RegisterBody(msgspec.Struct):
+    username: NonEmptyStr
+    email: NonEmptyStr
+    first_name: NonEmptyStr
+    last_name: NonEmptyStr
+    password: NonEmptyStr
+
+
+class LoginBody(msgspec.Struct):
+    identifier: NonEmptyStr
+    password: NonEmptyStr
+
+
+class ProfileUpdateBody(msgspec.Struct):
+    first_name: str | msgspec.UnsetType = msgspec.UNSET
+    last_name: str | msgspec.UnsetType = msgspec.UNSET
+    email: str | msgspec.UnsetType = msgspec.UNSET
+
+
+class ChangePasswordBody(msgspec.Struct):
+    current_password: NonEmptyStr
+    new_password: NonEmptyStr
+
+
+_decoders = {}
+
+
+def decode_body(body_type):
+    """Decode the raw request body into ``body_type``
+    
+    Raises ValueError with msgspec's message when the body is not valid JSON
+    or does not match the schema.
+    """
+    decoder = _decoders.get(body_type)
+    if decoder is None:
+        decoder = _decoders[body_type] = msgspec.json.Decoder(body_type)
+    
+    try:
+        return decoder.decode(request.get_data(cache=False))
+    except msgspec.DecodeError as e:
+        raise ValueError(str(e))
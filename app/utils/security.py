@@ -0,0 +1,47 @@
+"""
+Password hashing helpers
+
+Passwords are hashed with argon2id. Hashes created by Werkzeug before the
+switch are still accepted and flagged for rehashing on the next login.
+"""
+
+import secrets
+
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+from werkzeug.security import check_password_hash
+
+from app.utils.helpers import run_blocking
+
+ARGON2_PREFIX = '$argon2'
+
+password_hasher = PasswordHasher(time_cost=2, memory_cost=64 * 1024, parallelism=1)
+
+# Verified against when no user matches, so unknown accounts cost as much as a wrong password
+DUMMY_PASSWORD_HASH = password_hasher.hash(secrets.token_urlsafe(32))
+
+
+def hash_password(password):
+    """Hash a plain text password with argon2id"""
+    return run_blocking(password_hasher.hash, password)
+
+
+def _verify(password_hash, password):
+    if not password_hash.startswith(ARGON2_PREFIX):
+        return check_password_hash(password_hash, password)
+    try:
+        return password_hasher.verify(password_hash, password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+def verify_password(password_hash, password):
+    """Check a plain text password against a stored hash"""
+    return run_blocking(_verify, password_hash, password)
+
+
+def password_needs_rehash(password_hash):
+    """Check if a stored hash should be upgraded to the current parameters"""
+    if not password_hash.startswith(ARGON2_PREFIX):
+        return True
+    return password_hasher.check_needs_rehash(password_hash)
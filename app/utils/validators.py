@@ -1,14 +1,55 @@
-import re
+import string
+import time
 from datetime import datetime
+from functools import lru_cache
+
+
+# Lookup tables are built once at import instead of on every call
+TASK_STATUSES = ('pending', 'in_progress', 'completed', 'cancelled')
+TASK_PRIORITIES = ('low', 'medium', 'high', 'critical')
+_TASK_STATUS_SET = frozenset(TASK_STATUSES)
+_TASK_PRIORITY_SET = frozenset(TASK_PRIORITIES)
+_TASK_STATUS_MESSAGE = f"Status must be one of: {', '.join(TASK_STATUSES)}"
+_TASK_PRIORITY_MESSAGE = f"Priority must be one of: {', '.join(TASK_PRIORITIES)}"
+
+_EMAIL_LOCAL_CHARS = frozenset(string.ascii_letters + string.digits + '._%+-')
+_EMAIL_DOMAIN_CHARS = frozenset(string.ascii_letters + string.digits + '.-')
+_ASCII_LETTERS = frozenset(string.ascii_letters)
+_ASCII_DIGITS = frozenset(string.digits)
+_USERNAME_CHARS = frozenset(string.ascii_letters + string.digits + '_-')
+_NAME_CHARS = frozenset(string.ascii_letters + "'-")
+_NAME_BYTES = (string.ascii_letters + "'-").encode()
+_HEX_DIGITS = frozenset(string.hexdigits)
+
+DEFAULT_ALLOWED_MIME_TYPES = frozenset((
+    'text/plain', 'text/csv',
+    'application/pdf', 'application/msword',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+    'application/vnd.ms-excel',
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+    'image/jpeg', 'image/png', 'image/gif', 'image/bmp', 'image/webp'
+))
 
 
 def validate_email(email):
-    """Validate email format using regex"""
+    """Validate email format (local@domain.tld) with a single character scan"""
     if not email:
         return False
     
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
+    local, at, domain = email.partition('@')
+    if not at or not local or not _EMAIL_LOCAL_CHARS.issuperset(local):
+        return False
+    
+    # Domain is one or more allowed characters, then a dot and an alphabetic TLD
+    dot = domain.rfind('.')
+    tld = domain[dot + 1:]
+    return (
+        dot > 0
+        and len(tld) >= 2
+        and tld.isascii()
+        and tld.isalpha()
+        and _EMAIL_DOMAIN_CHARS.issuperset(domain)
+    )
 
 
 def validate_password(password):
@@ -16,17 +57,20 @@ def validate_password(password):
     if not password:
         return {'valid': False, 'message': 'Password is required'}
     
-    if len(password) < 8:
+    length = len(password)
+    if length < 8:
         return {'valid': False, 'message': 'Password must be at least 8 characters long'}
     
-    if len(password) > 128:
+    if length > 128:
         return {'valid': False, 'message': 'Password must be less than 128 characters'}
     
-    # Check for at least one letter and one number
-    if not re.search(r'[a-zA-Z]', password):
+    # Check for at least one letter and one number. Both set checks run in C
+    # and stop at the first hit; only passwords without an ASCII digit fall
+    # back to the Unicode-aware scan that matches the old \d semantics.
+    if _ASCII_LETTERS.isdisjoint(password):
         return {'valid': False, 'message': 'Password must contain at least one letter'}
     
-    if not re.search(r'\d', password):
+    if _ASCII_DIGITS.isdisjoint(password) and not any(char.isdecimal() for char in password):
         return {'valid': False, 'message': 'Password must contain at least one number'}
     
     return {'valid': True, 'message': 'Password is valid'}
@@ -37,14 +81,15 @@ def validate_username(username):
     if not username:
         return {'valid': False, 'message': 'Username is required'}
     
-    if len(username) < 3:
+    length = len(username)
+    if length < 3:
         return {'valid': False, 'message': 'Username must be at least 3 characters long'}
     
-    if len(username) > 80:
+    if length > 80:
         return {'valid': False, 'message': 'Username must be less than 80 characters'}
     
     # Only alphanumeric characters, underscores, and hyphens
-    if not re.match(r'^[a-zA-Z0-9_-]+$', username):
+    if not _USERNAME_CHARS.issuperset(username):
         return {'valid': False, 'message': 'Username can only contain letters, numbers, underscores, and hyphens'}
     
     return {'valid': True, 'message': 'Username is valid'}
@@ -55,14 +100,19 @@ def validate_name(name, field_name='Name'):
     if not name:
         return {'valid': False, 'message': f'{field_name} is required'}
     
-    if len(name) < 1:
-        return {'valid': False, 'message': f'{field_name} cannot be empty'}
-    
     if len(name) > 100:
         return {'valid': False, 'message': f'{field_name} must be less than 100 characters'}
     
-    # Only letters, spaces, hyphens, and apostrophes
-    if not re.match(r'^[a-zA-Z\s\'-]+$', name):
+    # Only letters, spaces, hyphens, and apostrophes. ASCII names (the common
+    # case) delete the allowed bytes in C and check what is left is whitespace
+    if name.isascii():
+        rest = name.encode().translate(None, _NAME_BYTES)
+        allowed = not rest or rest.decode().isspace()
+    else:
+        allowed = _NAME_CHARS.issuperset(name) or all(
+            char.isspace() for char in set(name) - _NAME_CHARS
+        )
+    if not allowed:
         return {'valid': False, 'message': f'{field_name} can only contain letters, spaces, hyphens, and apostrophes'}
     
     return {'valid': True, 'message': f'{field_name} is valid'}
@@ -70,20 +120,27 @@ def validate_name(name, field_name='Name'):
 
 def validate_task_status(status):
     """Validate task status"""
-    valid_statuses = ['pending', 'in_progress', 'completed', 'cancelled']
-    if status not in valid_statuses:
-        return {'valid': False, 'message': f"Status must be one of: {', '.join(valid_statuses)}"}
+    if status not in _TASK_STATUS_SET:
+        return {'valid': False, 'message': _TASK_STATUS_MESSAGE}
     return {'valid': True, 'message': 'Status is valid'}
 
 
 def validate_task_priority(priority):
     """Validate task priority"""
-    valid_priorities = ['low', 'medium', 'high', 'critical']
-    if priority not in valid_priorities:
-        return {'valid': False, 'message': f"Priority must be one of: {', '.join(valid_priorities)}"}
+    if priority not in _TASK_PRIORITY_SET:
+        return {'valid': False, 'message': _TASK_PRIORITY_MESSAGE}
     return {'valid': True, 'message': 'Priority is valid'}
 
 
+@lru_cache(maxsize=1)
+def _utc_today(minute):
+    """Today's UTC date, computed once per epoch minute.
+
+    UTC days are a whole number of minutes, so a bucket never spans midnight.
+    """
+    return datetime.utcnow().date()
+
+
 def validate_due_date(due_date_str):
     """Validate and parse due date"""
     if not due_date_str:
@@ -91,10 +148,12 @@ def validate_due_date(due_date_str):
     
     try:
         # Try to parse ISO format
-        due_date = datetime.fromisoformat(due_date_str.replace('Z', '+00:00'))
+        if due_date_str.endswith('Z'):
+            due_date_str = due_date_str[:-1] + '+00:00'
+        due_date = datetime.fromisoformat(due_date_str)
         
         # Check if date is in the past (allowing same day)
-        if due_date.date() < datetime.utcnow().date():
+        if due_date.date() < _utc_today(int(time.time()) // 60):
             return {'valid': False, 'date': None, 'message': 'Due date cannot be in the past'}
         
         return {'valid': True, 'date': due_date, 'message': 'Due date is valid'}
@@ -109,7 +168,7 @@ def validate_color_hex(color):
         return {'valid': False, 'message': 'Color is required'}
     
     # Check if it's a valid hex color
-    if not re.match(r'^#[0-9A-Fa-f]{6}$', color):
+    if len(color) != 7 or color[0] != '#' or not _HEX_DIGITS.issuperset(color[1:]):
         return {'valid': False, 'message': 'Color must be a valid hex code (e.g., #FF5733)'}
     
     return {'valid': True, 'message': 'Color is valid'}
@@ -128,14 +187,7 @@ def validate_file_size(file_size, max_size_mb=16):
 def validate_mime_type(mime_type, allowed_types=None):
     """Validate MIME type"""
     if allowed_types is None:
-        allowed_types = [
-            'text/plain', 'text/csv',
-            'application/pdf', 'application/msword',
-            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-            'application/vnd.ms-excel',
-            'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            'image/jpeg', 'image/png', 'image/gif', 'image/bmp', 'image/webp'
-        ]
+        allowed_types = DEFAULT_ALLOWED_MIME_TYPES
     
     if mime_type not in allowed_types:
         return {'valid': False, 'message': 'File type not allowed'}
@@ -5,19 +5,30 @@ Helper functions for broadcasting real-time updates from API endpoints
 
 from app import socketio, db
 from app.models.task import Task
-from app.models.project import Project
-from app.models.project_member import ProjectMember
-from datetime import datetime
+from app.models.task_comment import TaskComment
+from app.utils.helpers import utc_now_iso
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+def _user_summary(user):
+    """Public identity fields embedded in broadcast payloads"""
+    return {
+        'id': user.id,
+        'username': user.username,
+        'full_name': user.full_name
+    }
+
+
 def broadcast_task_assignment(task, assigned_to_user, assigned_by_user):
     """
     Broadcast task assignment notification
     """
     try:
+        timestamp = utc_now_iso()
+        assigned_to = _user_summary(assigned_to_user)
+        assigned_by = _user_summary(assigned_by_user)
         # Send notification to newly assigned user
         socketio.emit('task_assigned', {
             'task': {
@@ -29,40 +40,24 @@ def broadcast_task_assignment(task, assigned_to_user, assigned_by_user):
                 'project_id': task.project_id,
                 'due_date': task.due_date.isoformat() if task.due_date else None
             },
-            'assigned_to': {
-                'id': assigned_to_user.id,
-                'username': assigned_to_user.username,
-                'full_name': assigned_to_user.full_name
-            },
-            'assigned_by': {
-                'id': assigned_by_user.id,
-                'username': assigned_by_user.username,
-                'full_name': assigned_by_user.full_name
-            },
-            'timestamp': datetime.utcnow().isoformat()
+            'assigned_to': assigned_to,
+            'assigned_by': assigned_by,
+            'timestamp': timestamp
         }, room=f"user_{assigned_to_user.id}")
 
         # Broadcast to project room
         socketio.emit('task_assignment_changed', {
             'task_id': task.id,
             'task_title': task.title,
-            'assigned_to': {
-                'id': assigned_to_user.id,
-                'username': assigned_to_user.username,
-                'full_name': assigned_to_user.full_name
-            },
-            'assigned_by': {
-                'id': assigned_by_user.id,
-                'username': assigned_by_user.username,
-                'full_name': assigned_by_user.full_name
-            },
-            'timestamp': datetime.utcnow().isoformat()
+            'assigned_to': assigned_to,
+            'assigned_by': assigned_by,
+            'timestamp': timestamp
         }, room=f"project_{task.project_id}")
         
-        logger.info(f"Task {task.id} assignment broadcasted")
+        logger.info("Task %s assignment broadcasted", task.id)
         
     except Exception as e:
-        logger.error(f"Error broadcasting task assignment: {e}")
+        logger.error("Error broadcasting task assignment: %s", e)
 
 
 def broadcast_project_member_added(project, new_member_user, added_by_user):
@@ -70,6 +65,9 @@ def broadcast_project_member_added(project, new_member_user, added_by_user):
     Broadcast when a new member is added to a project
     """
     try:
+        timestamp = utc_now_iso()
+        new_member = _user_summary(new_member_user)
+        added_by = _user_summary(added_by_user)
         # Notify the new member
         socketio.emit('project_member_added', {
             'project': {
@@ -77,40 +75,24 @@ def broadcast_project_member_added(project, new_member_user, added_by_user):
                 'name': project.name,
                 'description': project.description
             },
-            'new_member': {
-                'id': new_member_user.id,
-                'username': new_member_user.username,
-                'full_name': new_member_user.full_name
-            },
-            'added_by': {
-                'id': added_by_user.id,
-                'username': added_by_user.username,
-                'full_name': added_by_user.full_name
-            },
-            'timestamp': datetime.utcnow().isoformat()
+            'new_member': new_member,
+            'added_by': added_by,
+            'timestamp': timestamp
         }, room=f"user_{new_member_user.id}")
 
         # Broadcast to project room
         socketio.emit('project_member_joined', {
             'project_id': project.id,
             'project_name': project.name,
-            'new_member': {
-                'id': new_member_user.id,
-                'username': new_member_user.username,
-                'full_name': new_member_user.full_name
-            },
-            'added_by': {
-                'id': added_by_user.id,
-                'username': added_by_user.username,
-                'full_name': added_by_user.full_name
-            },
-            'timestamp': datetime.utcnow().isoformat()
+            'new_member': new_member,
+            'added_by': added_by,
+            'timestamp': timestamp
         }, room=f"project_{project.id}")
         
-        logger.info(f"Project member addition broadcasted for project {project.id}")
+        logger.info("Project member addition broadcasted for project %s", project.id)
         
     except Exception as e:
-        logger.error(f"Error broadcasting project member addition: {e}")
+        logger.error("Error broadcasting project member addition: %s", e)
 
 
 def broadcast_task_due_reminder(task):
@@ -118,8 +100,13 @@ def broadcast_task_due_reminder(task):
     Broadcast task due date reminder
     """
     try:
-        if not task.assigned_to or not task.due_date:
+        assigned_to = task.assigned_to
+        due_date = task.due_date
+        if not assigned_to or not due_date:
             return
+
+        timestamp = utc_now_iso()
+        due_date = due_date.isoformat()
             
         # Send reminder to assigned user
         socketio.emit('task_due_reminder', {
@@ -130,26 +117,26 @@ def broadcast_task_due_reminder(task):
                 'status': task.status,
                 'priority': task.priority,
                 'project_id': task.project_id,
-                'due_date': task.due_date.isoformat()
+                'due_date': due_date
             },
             'reminder_type': 'due_soon',
-            'timestamp': datetime.utcnow().isoformat()
-        }, room=f"user_{task.assigned_to}")
+            'timestamp': timestamp
+        }, room=f"user_{assigned_to}")
 
         # Also broadcast to project room for awareness
         socketio.emit('task_due_alert', {
             'task_id': task.id,
             'task_title': task.title,
-            'assigned_to': task.assigned_to,
-            'due_date': task.due_date.isoformat(),
+            'assigned_to': assigned_to,
+            'due_date': due_date,
             'priority': task.priority,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': timestamp
         }, room=f"project_{task.project_id}")
         
-        logger.info(f"Task due reminder broadcasted for task {task.id}")
+        logger.info("Task due reminder broadcasted for task %s", task.id)
         
     except Exception as e:
-        logger.error(f"Error broadcasting task due reminder: {e}")
+        logger.error("Error broadcasting task due reminder: %s", e)
 
 
 def broadcast_project_stats_update(project_id):
@@ -157,20 +144,13 @@ def broadcast_project_stats_update(project_id):
     Broadcast updated project statistics
     """
     try:
-        # Calculate project statistics
-        total_tasks = db.session.query(Task).filter_by(project_id=project_id).count()
-        completed_tasks = db.session.query(Task).filter_by(
-            project_id=project_id, 
-            status='completed'
-        ).count()
-        in_progress_tasks = db.session.query(Task).filter_by(
-            project_id=project_id, 
-            status='in_progress'
-        ).count()
-        pending_tasks = db.session.query(Task).filter_by(
-            project_id=project_id, 
-            status='pending'
-        ).count()
+        # Calculate project statistics in a single pass over the project's tasks
+        total_tasks, completed_tasks, in_progress_tasks, pending_tasks = db.session.query(
+            db.func.count(),
+            db.func.count().filter(Task.status == 'completed'),
+            db.func.count().filter(Task.status == 'in_progress'),
+            db.func.count().filter(Task.status == 'pending')
+        ).filter(Task.project_id == project_id).one()
         
         progress_percentage = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
 
@@ -184,13 +164,13 @@ def broadcast_project_stats_update(project_id):
                 'pending_tasks': pending_tasks,
                 'progress_percentage': round(progress_percentage, 2)
             },
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': utc_now_iso()
         }, room=f"project_{project_id}")
         
-        logger.info(f"Project stats updated for project {project_id}")
+        logger.info("Project stats updated for project %s", project_id)
         
     except Exception as e:
-        logger.error(f"Error broadcasting project stats: {e}")
+        logger.error("Error broadcasting project stats: %s", e)
 
 
 def broadcast_bulk_task_update(project_id, task_ids, changes, updated_by_user):
@@ -202,21 +182,17 @@ def broadcast_bulk_task_update(project_id, task_ids, changes, updated_by_user):
             'project_id': project_id,
             'task_ids': task_ids,
             'changes': changes,
-            'updated_by': {
-                'id': updated_by_user.id,
-                'username': updated_by_user.username,
-                'full_name': updated_by_user.full_name
-            },
-            'timestamp': datetime.utcnow().isoformat()
+            'updated_by': _user_summary(updated_by_user),
+            'timestamp': utc_now_iso()
         }, room=f"project_{project_id}")
         
         # Also update project stats
         broadcast_project_stats_update(project_id)
         
-        logger.info(f"Bulk task update broadcasted for project {project_id}")
+        logger.info("Bulk task update broadcasted for project %s", project_id)
         
     except Exception as e:
-        logger.error(f"Error broadcasting bulk task update: {e}")
+        logger.error("Error broadcasting bulk task update: %s", e)
 
 
 def broadcast_system_maintenance(message, maintenance_type='info'):
@@ -227,13 +203,13 @@ def broadcast_system_maintenance(message, maintenance_type='info'):
         socketio.emit('system_announcement', {
             'type': maintenance_type,
             'message': message,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': utc_now_iso()
         })
         
-        logger.info(f"System announcement broadcasted: {message}")
+        logger.info("System announcement broadcasted: %s", message)
         
     except Exception as e:
-        logger.error(f"Error broadcasting system announcement: {e}")
+        logger.error("Error broadcasting system announcement: %s", e)
 
 
 def get_project_activity_summary(project_id, hours=24):
@@ -243,21 +219,49 @@ def get_project_activity_summary(project_id, hours=24):
     from datetime import datetime, timedelta
     
     try:
-        # This would typically query activity logs
-        # For now, return a basic structure
+        cutoff = datetime.utcnow() - timedelta(hours=hours)
+        
+        # Comment and active-user counts ride along as scalar subqueries, so
+        # the whole summary is one statement and one pass over the project's tasks
+        recent_comments = db.session.query(TaskComment.author_id).join(Task).filter(
+            Task.project_id == project_id,
+            TaskComment.created_at >= cutoff
+        )
+        recent_creators = db.session.query(Task.created_by).filter(
+            Task.project_id == project_id,
+            Task.created_at >= cutoff
+        )
+        comments_added = recent_comments.with_entities(
+            db.func.count(TaskComment.id)
+        ).scalar_subquery()
+        active_users = db.session.query(db.func.count()).select_from(
+            recent_creators.union(recent_comments).subquery()
+        ).scalar_subquery()
+        
+        recently_updated = Task.updated_at >= cutoff
+        tasks_created, tasks_updated, tasks_completed, comments_added, active_users = db.session.query(
+            db.func.count(Task.id).filter(Task.created_at >= cutoff),
+            db.func.count(Task.id).filter(recently_updated, Task.status != 'completed'),
+            # Tasks have no completed_at; a completed task last touched in the
+            # window is the closest available signal
+            db.func.count(Task.id).filter(recently_updated, Task.status == 'completed'),
+            comments_added,
+            active_users
+        ).filter(Task.project_id == project_id).one()
+        
         activity_summary = {
             'project_id': project_id,
             'timeframe_hours': hours,
-            'tasks_created': 0,
-            'tasks_updated': 0,
-            'tasks_completed': 0,
-            'comments_added': 0,
-            'active_users': 0,
-            'timestamp': datetime.utcnow().isoformat()
+            'tasks_created': tasks_created,
+            'tasks_updated': tasks_updated,
+            'tasks_completed': tasks_completed,
+            'comments_added': comments_added,
+            'active_users': active_users,
+            'timestamp': utc_now_iso()
         }
         
         return activity_summary
         
     except Exception as e:
-        logger.error(f"Error getting project activity summary: {e}")
+        logger.error("Error getting project activity summary: %s", e)
         return None
\ No newline at end of file
@@ -3,7 +3,7 @@ WebSocket Event Handlers for Real-time Task Management
 Handles real-time updates for tasks, projects, comments, and user interactions
 """
 
-from flask import session, request
+from flask import session, request, current_app
 from flask_socketio import emit, join_room, leave_room, disconnect
 from flask_jwt_extended import decode_token, JWTManager
 from app import socketio, db
@@ -12,7 +12,9 @@ from app.models.task import Task
 from app.models.project import Project
 from app.models.comment import Comment
 from app.models.project_member import ProjectMember
+from app.utils.helpers import utc_now_iso
 import logging
+import time
 from datetime import datetime
 import json
 
@@ -23,6 +25,8 @@ logger = logging.getLogger(__name__)
 # Store connected users
 connected_users = {}
 user_rooms = {}
+# When each user last broadcast "is typing" per task, to drop repeats
+typing_sent = {}
 
 
 def authenticate_socket_user():
@@ -38,7 +42,7 @@ def authenticate_socket_user():
                 if user:
                     return user
             except Exception as e:
-                logger.warning(f"JWT token authentication failed: {e}")
+                logger.warning("JWT token authentication failed: %s", e)
         
         # Fallback to session-based auth
         user_id = session.get('user_id')
@@ -49,7 +53,7 @@ def authenticate_socket_user():
                 
         return None
     except Exception as e:
-        logger.error(f"Socket authentication error: {e}")
+        logger.error("Socket authentication error: %s", e)
         return None
 
 
@@ -75,9 +79,12 @@ def on_connect():
     join_room(f"user_{user.id}")
     
     # Join user to project rooms they're member of
-    user_projects = db.session.query(ProjectMember).filter_by(user_id=user.id).all()
-    for project_member in user_projects:
-        room_name = f"project_{project_member.project_id}"
+    project_ids = [
+        project_id for project_id, in
+        db.session.query(ProjectMember.project_id).filter_by(user_id=user.id)
+    ]
+    for project_id in project_ids:
+        room_name = f"project_{project_id}"
         join_room(room_name)
         
         # Track user rooms
@@ -85,22 +92,22 @@ def on_connect():
             user_rooms[user.id] = set()
         user_rooms[user.id].add(room_name)
     
-    logger.info(f"User {user.username} connected with session {request.sid}")
+    logger.info("User %s connected with session %s", user.username, request.sid)
     
     # Emit user connected event to project rooms
-    for project_member in user_projects:
+    for project_id in project_ids:
         socketio.emit('user_connected', {
             'user_id': user.id,
             'username': user.username,
             'full_name': user.full_name,
-            'timestamp': datetime.utcnow().isoformat()
-        }, room=f"project_{project_member.project_id}")
+            'timestamp': utc_now_iso()
+        }, room=f"project_{project_id}")
     
     # Send initial connection success
     emit('connected', {
         'message': 'Successfully connected to real-time updates',
         'user_id': user.id,
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     })
 
 
@@ -118,16 +125,17 @@ def on_disconnect():
                 socketio.emit('user_disconnected', {
                     'user_id': user_id,
                     'username': username,
-                    'timestamp': datetime.utcnow().isoformat()
+                    'timestamp': utc_now_iso()
                 }, room=room_name)
             
             # Clean up user rooms
             del user_rooms[user_id]
+        typing_sent.pop(user_id, None)
         
         # Remove from connected users
         del connected_users[request.sid]
         
-        logger.info(f"User {username} disconnected")
+        logger.info("User %s disconnected", username)
 
 
 @socketio.on('join_project')
@@ -144,12 +152,14 @@ def on_join_project(data):
         return
     
     # Verify user has access to project
-    project_member = ProjectMember.query.filter_by(
-        user_id=user.id, 
-        project_id=project_id
-    ).first()
-    
-    if not project_member:
+    is_member = db.session.query(
+        ProjectMember.query.filter_by(
+            user_id=user.id,
+            project_id=project_id
+        ).exists()
+    ).scalar()
+    
+    if not is_member:
         emit('error', {'message': 'Access denied to project'})
         return
     
@@ -164,10 +174,10 @@ def on_join_project(data):
     emit('joined_project', {
         'project_id': project_id,
         'room': room_name,
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     })
     
-    logger.info(f"User {user.username} joined project {project_id}")
+    logger.info("User %s joined project %s", user.username, project_id)
 
 
 @socketio.on('leave_project')
@@ -190,7 +200,7 @@ def on_leave_project(data):
     
     emit('left_project', {
         'project_id': project_id,
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     })
 
 
@@ -233,10 +243,10 @@ def on_task_created(data):
             'username': user.username,
             'full_name': user.full_name
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{project_id}")
     
-    logger.info(f"Task {task_id} created by {user.username} in project {project_id}")
+    logger.info("Task %s created by %s in project %s", task_id, user.username, project_id)
 
 
 @socketio.on('task_updated')
@@ -279,10 +289,10 @@ def on_task_updated(data):
             'username': user.username,
             'full_name': user.full_name
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{task.project_id}")
     
-    logger.info(f"Task {task_id} updated by {user.username}")
+    logger.info("Task %s updated by %s", task_id, user.username)
 
 
 @socketio.on('task_status_changed')
@@ -317,7 +327,7 @@ def on_task_status_changed(data):
             'username': user.username,
             'full_name': user.full_name
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{task.project_id}")
     
     # Send notification to assigned user if different from changer
@@ -326,7 +336,7 @@ def on_task_status_changed(data):
             'type': 'task_status_changed',
             'message': f'{user.full_name} changed status of "{task.title}" to {new_status}',
             'task_id': task_id,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': utc_now_iso()
         }, room=f"user_{task.assigned_to}")
 
 
@@ -355,10 +365,10 @@ def on_task_deleted(data):
             'username': user.username,
             'full_name': user.full_name
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{project_id}")
     
-    logger.info(f"Task {task_id} deleted by {user.username}")
+    logger.info("Task %s deleted by %s", task_id, user.username)
 
 
 @socketio.on('comment_added')
@@ -398,7 +408,7 @@ def on_comment_added(data):
             'title': task.title,
             'project_id': task.project_id
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{task.project_id}")
     
     # Send notification to task assignee if different from commenter
@@ -408,7 +418,7 @@ def on_comment_added(data):
             'message': f'{user.full_name} commented on "{task.title}"',
             'task_id': task_id,
             'comment_id': comment_id,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': utc_now_iso()
         }, room=f"user_{task.assigned_to}")
 
 
@@ -448,7 +458,7 @@ def on_project_updated(data):
             'username': user.username,
             'full_name': user.full_name
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{project_id}")
 
 
@@ -465,6 +475,18 @@ def on_user_typing(data):
     if not task_id:
         return
     
+    # Clients repeat "is typing" on every keystroke; within the coalescing
+    # window the indicator is already shown, so skip the lookup and broadcast
+    user_typing = typing_sent.setdefault(user.id, {})
+    now = time.monotonic()
+    if is_typing:
+        last_sent = user_typing.get(task_id)
+        if last_sent is not None and now - last_sent < current_app.config['TYPING_COALESCE_MS'] / 1000:
+            return
+        user_typing[task_id] = now
+    else:
+        user_typing.pop(task_id, None)
+    
     # Get task to find project
     task = Task.query.get(task_id)
     if not task:
@@ -477,7 +499,7 @@ def on_user_typing(data):
         'full_name': user.full_name,
         'task_id': task_id,
         'is_typing': is_typing,
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{task.project_id}", include_self=False)
 
 
@@ -494,12 +516,14 @@ def on_get_online_users(data):
         return
     
     # Verify user has access to project
-    project_member = ProjectMember.query.filter_by(
-        user_id=user.id, 
-        project_id=project_id
-    ).first()
-    
-    if not project_member:
+    is_member = db.session.query(
+        ProjectMember.query.filter_by(
+            user_id=user.id,
+            project_id=project_id
+        ).exists()
+    ).scalar()
+    
+    if not is_member:
         emit('error', {'message': 'Access denied to project'})
         return
     
@@ -522,7 +546,7 @@ def on_get_online_users(data):
         'project_id': project_id,
         'users': online_users,
         'count': len(online_users),
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     })
 
 
@@ -537,7 +561,7 @@ def on_ping():
     if request.sid in connected_users:
         connected_users[request.sid]['last_activity'] = datetime.utcnow()
     
-    emit('pong', {'timestamp': datetime.utcnow().isoformat()})
+    emit('pong', {'timestamp': utc_now_iso()})
 
 
 # Utility functions for triggering events from API endpoints
@@ -561,7 +585,7 @@ def emit_task_created(task, created_by_user):
             'username': created_by_user.username,
             'full_name': created_by_user.full_name
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{task.project_id}")
 
 
@@ -586,7 +610,7 @@ def emit_task_updated(task, updated_by_user, changes=None):
             'username': updated_by_user.username,
             'full_name': updated_by_user.full_name
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{task.project_id}")
 
 
@@ -601,7 +625,7 @@ def emit_task_deleted(task_id, project_id, task_title, deleted_by_user):
             'username': deleted_by_user.username,
             'full_name': deleted_by_user.full_name
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{project_id}")
 
 
@@ -621,7 +645,7 @@ def emit_comment_added(comment, task, author):
             'title': task.title,
             'project_id': task.project_id
         },
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': utc_now_iso()
     }, room=f"project_{task.project_id}")
 
 
@@ -630,6 +654,6 @@ def emit_notification(user_id, notification_type, message, **kwargs):
     socketio.emit('notification', {
         'type': notification_type,
         'message': message,
-        'timestamp': datetime.utcnow().isoformat(),
+        'timestamp': utc_now_iso(),
         **kwargs
     }, room=f"user_{user_id}")
\ No newline at end of file
@@ -5,14 +5,24 @@ Main application entry point with Flask-SocketIO integration
 """
 
 import os
+
+# socketio.run() does not monkey patch, so do it before anything imports
+# socket or threading; gunicorn's eventlet worker patches on its own
+if __name__ == '__main__' and (os.environ.get('SOCKETIO_ASYNC_MODE') or 'eventlet') == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
+
 import sys
+import orjson
 from flask import Flask
 
+# Read once; the configuration name also decides debug mode in __main__
+FLASK_ENV = os.getenv('FLASK_ENV', 'default')
+
 # Create application instance with error handling
 try:
     from app import create_app, socketio, db
-    from flask_migrate import upgrade
-    app = create_app(os.getenv('FLASK_ENV', 'default'))
+    app = create_app(FLASK_ENV)
 except Exception as e:
     print(f"Error creating application: {e}", file=sys.stderr)
     # Create a minimal Flask app for error handling
@@ -29,8 +39,13 @@ except Exception as e:
 def deploy():
     """Run deployment tasks."""
     if db is not None:
-        # Create database tables
-        db.create_all()
+        from flask_migrate import upgrade
+        from sqlalchemy import inspect
+
+        # Create database tables; one table listing replaces create_all's
+        # per-table existence checks when the schema is already in place
+        if set(db.metadata.tables) - set(inspect(db.engine).get_table_names()):
+            db.create_all()
         
         # Migrate database to latest revision
         upgrade()
@@ -40,32 +55,37 @@ def deploy():
 @app.shell_context_processor
 def make_shell_context():
     """Make database models available in shell context."""
-    from app.models.user import User
-    from app.models.project import Project
-    from app.models.task import Task
-    from app.models.comment import Comment
-    from app.models.project_member import ProjectMember
+    from app.models import (
+        User, Project, ProjectMember, Task, TaskComment, Category, TaskCategory, Attachment
+    )
     
     return {
         'db': db,
         'User': User,
         'Project': Project,
-        'Task': Task,
-        'Comment': Comment,
         'ProjectMember': ProjectMember,
+        'Task': Task,
+        'TaskComment': TaskComment,
+        'Category': Category,
+        'TaskCategory': TaskCategory,
+        'Attachment': Attachment,
         'app': app,
         'socketio': socketio
     }
 
+# The constant health payload is serialized once; each request still gets its
+# own Response since after_request hooks (CORS) add headers to it
+_HEALTH_BODY = orjson.dumps({
+    'status': 'healthy',
+    'message': 'Task Manager API is running',
+    'websocket_enabled': True
+})
+
 # Health check endpoint (must be defined before any database operations)
 @app.route('/health')
 def health_check():
     """Health check endpoint for deployment monitoring."""
-    return {
-        'status': 'healthy',
-        'message': 'Task Manager API is running',
-        'websocket_enabled': True
-    }
+    return app.response_class(_HEALTH_BODY, mimetype='application/json')
 
 # Database initialization removed to fix startup issues
 # Tables will be created on first request if needed
@@ -73,13 +93,17 @@ def health_check():
 # WebSocket status endpoint
 @app.route('/websocket/status')
 def websocket_status():
-    """WebSocket status endpoint."""
-    return {
+    """WebSocket status endpoint; counts cover this worker's connections."""
+    if socketio is None:
+        return {'websocket_enabled': False, 'status': 'unavailable'}, 503
+    
+    from app.websocket.events import connected_users, user_rooms
+    return app.response_class(orjson.dumps({
         'websocket_enabled': True,
-        'connected_users': 0,
-        'active_rooms': 0,
+        'connected_users': len(connected_users),
+        'active_rooms': len(set().union(*user_rooms.values())),
         'status': 'active'
-    }
+    }), mimetype='application/json')
 
 # For production deployment with gunicorn
 if __name__ == '__main__':
@@ -89,6 +113,6 @@ if __name__ == '__main__':
         app,
         host='0.0.0.0',
         port=port,
-        debug=os.environ.get('FLASK_ENV') == 'development',
+        debug=FLASK_ENV == 'development',
         allow_unsafe_werkzeug=True  # For development only
     )
\ No newline at end of file
@@ -20,13 +20,14 @@ def upgrade():
     # Add missing columns to users table
     op.add_column('users', sa.Column('first_name', sa.String(100), nullable=True))
     op.add_column('users', sa.Column('last_name', sa.String(100), nullable=True))
-    op.add_column('users', sa.Column('is_verified', sa.Boolean(), nullable=True, default=False))
+    # A constant server default fills existing rows as part of ADD COLUMN
+    op.add_column('users', sa.Column('is_verified', sa.Boolean(), nullable=False, server_default=sa.false()))
     
     # Create categories table
     op.create_table('categories',
         sa.Column('id', sa.Integer(), nullable=False),
         sa.Column('name', sa.String(100), nullable=False),
-        sa.Column('color', sa.String(7), nullable=False, default='#007bff'),
+        sa.Column('color', sa.String(7), nullable=False, server_default='#007bff'),
         sa.Column('user_id', sa.Integer(), nullable=False),
         sa.Column('created_at', sa.DateTime(), nullable=False),
         sa.Column('updated_at', sa.DateTime(), nullable=False),
@@ -71,14 +72,17 @@ def upgrade():
 
     # Update existing users to have the new required fields
     # This is a data migration - set default values for existing users
-    op.execute("UPDATE users SET first_name = 'Unknown' WHERE first_name IS NULL")
-    op.execute("UPDATE users SET last_name = 'User' WHERE last_name IS NULL")
-    op.execute("UPDATE users SET is_verified = false WHERE is_verified IS NULL")
+    # One pass rewrites each affected row once instead of once per column
+    op.execute(
+        "UPDATE users SET "
+        "first_name = COALESCE(first_name, 'Unknown'), "
+        "last_name = COALESCE(last_name, 'User') "
+        "WHERE first_name IS NULL OR last_name IS NULL"
+    )
     
     # Make the columns non-nullable after setting default values
     op.alter_column('users', 'first_name', nullable=False)
     op.alter_column('users', 'last_name', nullable=False)
-    op.alter_column('users', 'is_verified', nullable=False)
 
 
 def downgrade():
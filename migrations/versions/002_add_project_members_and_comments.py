@@ -22,7 +22,7 @@ def upgrade():
         sa.Column('id', sa.Integer(), nullable=False),
         sa.Column('project_id', sa.Integer(), nullable=False),
         sa.Column('user_id', sa.Integer(), nullable=False),
-        sa.Column('role', sa.String(50), nullable=False, default='member'),
+        sa.Column('role', sa.String(50), nullable=False, server_default='member'),
         sa.Column('joined_at', sa.DateTime(), nullable=False),
         sa.Column('created_at', sa.DateTime(), nullable=False),
         sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
@@ -41,7 +41,7 @@ def upgrade():
         sa.Column('author_id', sa.Integer(), nullable=False),
         sa.Column('created_at', sa.DateTime(), nullable=False),
         sa.Column('updated_at', sa.DateTime(), nullable=False),
-        sa.Column('is_edited', sa.Boolean(), nullable=False, default=False),
+        sa.Column('is_edited', sa.Boolean(), nullable=False, server_default=sa.false()),
         sa.ForeignKeyConstraint(['author_id'], ['users.id'], ),
         sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ),
         sa.PrimaryKeyConstraint('id')
@@ -0,0 +1,29 @@
+"""Add attachment listing indexes
+
+Revision ID: 003
+Revises: 002
+Create Date: 2026-10-15 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves "my attachments" ordered newest first without a sort step
+    op.create_index('ix_att_user_created', 'attachments', ['uploaded_by', sa.text('created_at DESC')], unique=False)
+    # Lets LIKE 'image/%' prefix filters use a btree index
+    op.create_index('ix_att_mime', 'attachments', ['mime_type'], unique=False,
+                    postgresql_ops={'mime_type': 'text_pattern_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_att_mime', table_name='attachments')
+    op.drop_index('ix_att_user_created', table_name='attachments')
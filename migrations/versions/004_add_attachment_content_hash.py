@@ -0,0 +1,26 @@
+"""Add attachment content hash for upload dedupe
+
+Revision ID: 004
+Revises: 003
+Create Date: 2026-10-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('attachments', sa.Column('content_hash', sa.String(64), nullable=True))
+    op.create_index('idx_attachment_content_hash', 'attachments', ['content_hash'], unique=False)
+
+
+def downgrade():
+    op.drop_index('idx_attachment_content_hash', table_name='attachments')
+    op.drop_column('attachments', 'content_hash')
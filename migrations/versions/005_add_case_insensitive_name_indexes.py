@@ -0,0 +1,28 @@
+"""Add case-insensitive unique name indexes for categories and projects
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-15 11:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Duplicate names are now rejected by the database instead of an ILIKE pre-check.
+    # Existing case-insensitive duplicates must be renamed before this runs.
+    op.create_index('ix_category_user_lname', 'categories', ['user_id', sa.text('lower(name)')], unique=True)
+    op.create_index('ix_project_owner_lname', 'projects', ['owner_id', sa.text('lower(name)')], unique=True)
+
+
+def downgrade():
+    op.drop_index('ix_project_owner_lname', table_name='projects')
+    op.drop_index('ix_category_user_lname', table_name='categories')
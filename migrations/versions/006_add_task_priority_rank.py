@@ -0,0 +1,35 @@
+"""Add task priority rank for index-friendly priority ordering
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-15 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('tasks', sa.Column('priority_rank', sa.SmallInteger(), nullable=True))
+    op.execute("""
+        UPDATE tasks SET priority_rank = CASE priority
+            WHEN 'low' THEN 1
+            WHEN 'medium' THEN 2
+            WHEN 'high' THEN 3
+            WHEN 'critical' THEN 4
+        END
+    """)
+    op.alter_column('tasks', 'priority_rank', nullable=False)
+    op.create_index('ix_task_cat_order', 'tasks', [sa.text('priority_rank DESC'), sa.text('created_at DESC')], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_task_cat_order', table_name='tasks')
+    op.drop_column('tasks', 'priority_rank')
@@ -0,0 +1,39 @@
+"""Add trigram indexes for user search
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-15 13:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+SEARCH_COLUMNS = ('username', 'first_name', 'last_name', 'email')
+
+
+def upgrade():
+    # GIN trigram indexes let PostgreSQL serve search_users' ILIKE '%term%'
+    # filters without a sequential scan. They live only in migrations since
+    # they need the pg_trgm extension, which db.create_all() cannot provide.
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for column in SEARCH_COLUMNS:
+        op.create_index(
+            f'ix_users_{column}_trgm',
+            'users',
+            [column],
+            unique=False,
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'}
+        )
+
+
+def downgrade():
+    for column in reversed(SEARCH_COLUMNS):
+        op.drop_index(f'ix_users_{column}_trgm', table_name='users')
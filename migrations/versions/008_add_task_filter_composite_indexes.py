@@ -0,0 +1,35 @@
+"""Add composite indexes for task list filters and membership lookups
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-15 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Dashboard overdue/upcoming lists and counts filter on assignee, status and due date
+    op.create_index('ix_tasks_assigned_status_due', 'tasks', ['assigned_to', 'status', 'due_date'], unique=False)
+    # Project- and creator-filtered task lists sorted (and keyset paginated) by created_at
+    op.create_index('ix_tasks_project_created', 'tasks', ['project_id', 'created_at'], unique=False)
+    op.create_index('ix_tasks_created_by_created', 'tasks', ['created_by', 'created_at'], unique=False)
+    # Category filter joins from category to task; membership checks start from the user
+    op.create_index('ix_task_categories_category_task', 'task_categories', ['category_id', 'task_id'], unique=False)
+    op.create_index('ix_project_members_user_project', 'project_members', ['user_id', 'project_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_project_members_user_project', table_name='project_members')
+    op.drop_index('ix_task_categories_category_task', table_name='task_categories')
+    op.drop_index('ix_tasks_created_by_created', table_name='tasks')
+    op.drop_index('ix_tasks_project_created', table_name='tasks')
+    op.drop_index('ix_tasks_assigned_status_due', table_name='tasks')
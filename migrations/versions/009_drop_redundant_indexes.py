@@ -0,0 +1,61 @@
+"""Drop single-column indexes already covered by composite indexes
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-15 16:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+# Indexes created by earlier migrations, each a leading-column prefix of a
+# unique constraint or composite index on the same table
+COVERED_INDEXES = (
+    ('idx_category_user', 'categories', ['user_id']),              # ix_category_user_lname
+    ('idx_task_category_task', 'task_categories', ['task_id']),    # unique_task_category
+    ('idx_task_category_category', 'task_categories', ['category_id']),  # ix_task_categories_category_task
+    ('idx_project_member_project', 'project_members', ['project_id']),   # unique_project_member
+    ('idx_project_member_user', 'project_members', ['user_id']),   # ix_project_members_user_project
+    ('idx_attachment_uploader', 'attachments', ['uploaded_by']),   # ix_att_user_created
+)
+
+# Duplicates that only exist where tables were built with db.create_all(),
+# which added an index for every column declared with index=True
+CREATE_ALL_INDEXES = (
+    ('ix_categories_user_id', 'categories'),
+    ('ix_task_categories_task_id', 'task_categories'),
+    ('ix_task_categories_category_id', 'task_categories'),
+    ('ix_project_members_project_id', 'project_members'),
+    ('ix_project_members_user_id', 'project_members'),
+    ('ix_attachments_task_id', 'attachments'),
+    ('ix_attachments_uploaded_by', 'attachments'),
+    ('ix_task_comments_task_id', 'task_comments'),
+    ('ix_task_comments_author_id', 'task_comments'),
+    ('ix_projects_owner_id', 'projects'),
+    ('ix_projects_status', 'projects'),
+    ('idx_project_owner', 'projects'),
+    ('ix_tasks_project_id', 'tasks'),
+    ('ix_tasks_assigned_to', 'tasks'),
+    ('ix_tasks_created_by', 'tasks'),
+)
+
+
+def upgrade():
+    for name, table, _ in COVERED_INDEXES:
+        op.drop_index(name, table_name=table)
+    for name, table in CREATE_ALL_INDEXES:
+        op.drop_index(name, table_name=table, if_exists=True)
+
+
+def downgrade():
+    # Only the migration-managed indexes are restored; the create_all()
+    # duplicates were never part of the migration history
+    for name, table, columns in reversed(COVERED_INDEXES):
+        op.create_index(name, table, columns, unique=False)
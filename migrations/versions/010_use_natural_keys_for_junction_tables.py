@@ -0,0 +1,40 @@
+"""Use the natural key as primary key for project members and task categories
+
+Revision ID: 010
+Revises: 009
+Create Date: 2026-10-15 16:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '010'
+down_revision = '009'
+branch_labels = None
+depends_on = None
+
+# (table, natural key columns, unique constraint the primary key replaces)
+JUNCTION_TABLES = (
+    ('project_members', ['project_id', 'user_id'], 'unique_project_member'),
+    ('task_categories', ['task_id', 'category_id'], 'unique_task_category'),
+)
+
+
+def upgrade():
+    # Nothing references the surrogate ids, so the natural key can serve as
+    # the primary key and the separate unique index goes away
+    for table, columns, unique_name in JUNCTION_TABLES:
+        op.drop_constraint(f'{table}_pkey', table, type_='primary')
+        op.drop_column(table, 'id')
+        op.drop_constraint(unique_name, table, type_='unique')
+        op.create_primary_key(f'{table}_pkey', table, columns)
+
+
+def downgrade():
+    for table, columns, unique_name in reversed(JUNCTION_TABLES):
+        op.drop_constraint(f'{table}_pkey', table, type_='primary')
+        op.create_unique_constraint(unique_name, table, columns)
+        op.execute(f'ALTER TABLE {table} ADD COLUMN id SERIAL')
+        op.create_primary_key(f'{table}_pkey', table, ['id'])
@@ -0,0 +1,42 @@
+"""Generate created/updated timestamps in the database
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-15 17:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '011'
+down_revision = '010'
+branch_labels = None
+depends_on = None
+
+UTC_NOW = sa.text("TIMEZONE('utc', CURRENT_TIMESTAMP)")
+
+TIMESTAMP_COLUMNS = (
+    ('attachments', 'created_at'),
+    ('categories', 'created_at'),
+    ('categories', 'updated_at'),
+    ('task_categories', 'created_at'),
+    ('projects', 'created_at'),
+    ('projects', 'updated_at'),
+    ('project_members', 'joined_at'),
+    ('project_members', 'created_at'),
+    ('task_comments', 'created_at'),
+    ('task_comments', 'updated_at'),
+)
+
+
+def upgrade():
+    # The models no longer send these values on insert
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=UTC_NOW)
+
+
+def downgrade():
+    for table, column in reversed(TIMESTAMP_COLUMNS):
+        op.alter_column(table, column, server_default=None)
@@ -0,0 +1,25 @@
+"""Add a (project_id, status) index for per-project task counts
+
+Revision ID: 012
+Revises: 011
+Create Date: 2026-10-15 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '012'
+down_revision = '011'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Project stats count tasks per status; COUNT(*) over this index is an index-only scan
+    op.create_index('ix_tasks_project_status', 'tasks', ['project_id', 'status'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_tasks_project_status', table_name='tasks')
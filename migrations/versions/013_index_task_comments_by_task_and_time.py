@@ -0,0 +1,28 @@
+"""Index task comments by task and creation time
+
+Revision ID: 013
+Revises: 012
+Create Date: 2026-10-15 19:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '013'
+down_revision = '012'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves a task's comments in chronological order and per-task recent
+    # activity windows; supersedes the task_id-only index
+    op.create_index('idx_comment_task_created', 'task_comments', ['task_id', 'created_at'], unique=False)
+    op.drop_index('idx_comment_task', table_name='task_comments')
+
+
+def downgrade():
+    op.create_index('idx_comment_task', 'task_comments', ['task_id'], unique=False)
+    op.drop_index('idx_comment_task_created', table_name='task_comments')
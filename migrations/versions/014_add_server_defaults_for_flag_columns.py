@@ -0,0 +1,35 @@
+"""Give flag and enum-like columns database-side defaults
+
+Revision ID: 014
+Revises: 013
+Create Date: 2026-10-15 20:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '014'
+down_revision = '013'
+branch_labels = None
+depends_on = None
+
+SERVER_DEFAULTS = (
+    ('users', 'is_verified', sa.false()),
+    ('categories', 'color', '#007bff'),
+    ('project_members', 'role', 'member'),
+    ('task_comments', 'is_edited', sa.false()),
+)
+
+
+def upgrade():
+    # Databases migrated before 001/002 declared these defaults; setting a
+    # constant default only updates the catalog
+    for table, column, default in SERVER_DEFAULTS:
+        op.alter_column(table, column, server_default=default)
+
+
+def downgrade():
+    for table, column, _ in reversed(SERVER_DEFAULTS):
+        op.alter_column(table, column, server_default=None)
@@ -2,31 +2,24 @@
 """
 Task Manager Application Entry Point
 
-This file serves as the main entry point for the Flask application.
+Kept for ``python run.py`` and existing tooling; the application itself is
+built once in app_socketio.py so every entrypoint serves the same instance.
 """
 
 import os
-from app import create_app, db
-from app.models import User, Project, ProjectMember, Task, TaskComment, Category, TaskCategory, Attachment
 
-# Create Flask application instance
-app = create_app(os.environ.get('FLASK_ENV', 'development'))
+# Patch before app_socketio pulls in socket/threading users (see app_socketio.py)
+if __name__ == '__main__' and (os.environ.get('SOCKETIO_ASYNC_MODE') or 'eventlet') == 'eventlet':
+    import eventlet
+    eventlet.monkey_patch()
 
-# Make shell context available for flask shell command
-@app.shell_context_processor
-def make_shell_context():
-    """Make database models available in flask shell"""
-    return {
-        'db': db,
-        'User': User,
-        'Project': Project,
-        'ProjectMember': ProjectMember,
-        'Task': Task,
-        'TaskComment': TaskComment,
-        'Category': Category,
-        'TaskCategory': TaskCategory,
-        'Attachment': Attachment
-    }
+from app_socketio import app, socketio, db  # noqa: F401,E402
 
 if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    socketio.run(
+        app,
+        debug=True,
+        host='0.0.0.0',
+        port=int(os.environ.get('PORT', 5000)),
+        allow_unsafe_werkzeug=True  # For development only
+    )
@@ -160,9 +160,6 @@ class TaskManagerWebSocketClient:
 
 # Example usage
 if __name__ == '__main__':
-    import time
-    import threading
-    
     # Create client instance
     client = TaskManagerWebSocketClient(
         server_url='http://localhost:5000',
@@ -179,17 +176,16 @@ if __name__ == '__main__':
         # Example: Get online users (replace with actual project ID)
         # client.get_online_users(1)
         
-        # Send periodic pings
+        # Send periodic pings on the client's own background task runner
         def send_pings():
             while True:
-                time.sleep(30)  # Ping every 30 seconds
+                client.sio.sleep(30)  # Ping every 30 seconds
                 try:
                     client.ping()
                 except:
                     break
         
-        ping_thread = threading.Thread(target=send_pings, daemon=True)
-        ping_thread.start()
+        client.sio.start_background_task(send_pings)
         
         try:
             # Keep the client running